@@ -0,0 +1,295 @@
+"""并发压力测试：模拟多个书记/管理员会话同时操作，比较不同存储与缓存模式
+
+每个模拟会话是一个线程（与 Streamlit 服务端每个会话一个线程一致），
+直接调用 PartyOrganization 的无界面 API，按配置比例执行查询、写入、阶段变更与统计。
+
+用法：
+    python load_test.py                                    # 默认比较全部模式
+    python load_test.py --sessions 16 --ops 200 --students 2000
+    python load_test.py --modes shared,per-rerun --mix query=5,write=3,transition=1,stats=1
+
+模式：
+    shared          所有会话共享一个组织对象，启用渲染缓存
+    shared-watch    同上，并启动数据文件监听线程（当前主程序的做法），
+                    每次保存触发的监听回调与页面操作争用同一把锁
+    shared-nocache  同 shared，但禁用渲染缓存
+    per-rerun       每次操作重新 load_data() 构造组织对象（旧的每次重跑都整文件加载的做法）
+
+操作：
+    query       查询学生详情
+    write       添加积极分子考察记录（仅入党积极分子阶段可成功）
+    transition  确定为发展对象（每名学生只能成功一次，之后其 write 操作会失败）
+    stats       统计页
+
+丢失更新：每次成功的写入或阶段变更都会新增一条流程记录，结束后重新读取数据文件，
+统计“应新增条数 - 实际新增条数”之和。
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from utils.constants import DATA_FILE_PATH, DATA_JOURNAL_PATH, REVIEW_REQUIRED_COUNT
+from utils.enums import PartyMemberStatus
+from utils.models import Student, PartyMemberInfo
+
+MODES = {
+    # 模式名 -> (是否共享组织对象, 是否启用渲染缓存, 是否启动文件监听)
+    "shared": (True, True, False),
+    "shared-watch": (True, True, True),
+    "shared-nocache": (True, False, False),
+    "per-rerun": (False, True, False),
+}
+OPERATIONS = {
+    # 操作名 -> 调用（返回是否成功）
+    "query": lambda org, sid, idx: org.query_member(sid) is not None,
+    "write": lambda org, sid, idx: org.add_active_review(sid, "压力测试考察记录", f"会话{idx}"),
+    "transition": lambda org, sid, idx: org.confirm_development_object(sid, f"会话{idx}", "压力测试阶段变更"),
+    "stats": lambda org, sid, idx: org.statistics() is None,
+}
+RECORDING_OPERATIONS = ("write", "transition")  # 成功时会新增一条流程记录的操作
+DEFAULT_MIX = "query=6,write=3,transition=1,stats=1"
+
+
+def seed_data(path: str, students: int) -> None:
+    """生成测试数据：全部学生处于入党积极分子阶段且考察次数已满足要求
+
+    因此既可反复添加考察记录，也可确定为发展对象
+    """
+    data = {}
+    for i in range(students):
+        student_id = f"T{i:06d}"
+        member_info = PartyMemberInfo(Student(student_id, f"测试{i}", "测试学院", "测试专业", "2024级", "-"))
+        member_info.status = PartyMemberStatus.ACTIVE_MEMBER
+        member_info.extra_info["active_member_reviews"] = [
+            {"review_time": 0, "reviewer": "压力测试", "content": "初始考察记录"}
+            for _ in range(REVIEW_REQUIRED_COUNT)
+        ]
+        member_info.add_process_record("初始化党建信息", "压力测试数据")
+        data[student_id] = member_info.to_dict()
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+
+
+def read_io_counters() -> Optional[Dict[str, int]]:
+    """读取本进程累计读写字节数（仅 Linux 提供 /proc/self/io）"""
+    try:
+        with open("/proc/self/io", "r") as f:
+            fields = dict(line.split(":") for line in f.read().splitlines())
+        return {"read": int(fields["rchar"]), "write": int(fields["wchar"])}
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+class LoadTest:
+    """在临时目录中运行一种模式的压力测试"""
+
+    def __init__(self, mode: str, sessions: int, ops: int, students: int,
+                 mix: Dict[str, int], think_time: float, seed: int):
+        self.shared, self.render_cache, self.watch = MODES[mode]
+        self.mode = mode
+        self.sessions = sessions
+        self.ops = ops
+        self.students = students
+        self.mix = mix
+        self.think_time = think_time
+        self.seed = seed
+        self.latencies: Dict[str, List[float]] = {name: [] for name in mix}
+        self.expected_writes: Dict[str, int] = {}
+        self.errors = 0
+        self._stats_lock = threading.Lock()
+
+    def run(self) -> Dict:
+        workdir = tempfile.mkdtemp(prefix="party_load_")
+        cwd = os.getcwd()
+        os.chdir(workdir)  # 数据文件与历史目录均为相对路径
+        watcher = None
+        try:
+            seed_data(DATA_FILE_PATH, self.students)
+            shared_org = self._new_org() if self.shared else None
+            if self.watch:
+                from utils.data_watcher import DataFileWatcher
+                watcher = DataFileWatcher(shared_org, DATA_FILE_PATH, DATA_JOURNAL_PATH)
+                watcher.start()
+            io_before = read_io_counters()
+            start = time.perf_counter()
+            threads = [
+                threading.Thread(target=self._session, args=(idx, shared_org))
+                for idx in range(self.sessions)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start
+            io_after = read_io_counters()
+            return self._report(elapsed, io_before, io_after)
+        finally:
+            if watcher is not None:
+                watcher.stop()
+            os.chdir(cwd)
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    def _new_org(self):
+        from utils.organization import PartyOrganization
+        from utils.render_cache import RenderCache
+
+        org = PartyOrganization()
+        if not self.render_cache:
+            org.render_cache = RenderCache(maxsize=0)
+        return org
+
+    def _session(self, idx: int, shared_org) -> None:
+        """单个模拟会话：按比例随机执行操作"""
+        rng = random.Random(self.seed + idx)
+        names, weights = list(self.mix), list(self.mix.values())
+        for _ in range(self.ops):
+            op = rng.choices(names, weights)[0]
+            student_id = f"T{rng.randrange(self.students):06d}"
+            start = time.perf_counter()
+            try:
+                # per-rerun 模式下每次操作都像页面重跑一样重新加载整个数据文件
+                org = shared_org if shared_org is not None else self._new_org()
+                ok = OPERATIONS[op](org, student_id, idx)
+            except Exception:
+                ok = False
+                with self._stats_lock:
+                    self.errors += 1
+            latency = time.perf_counter() - start
+            with self._stats_lock:
+                self.latencies[op].append(latency)
+                if op in RECORDING_OPERATIONS and ok:
+                    self.expected_writes[student_id] = self.expected_writes.get(student_id, 0) + 1
+            if self.think_time:
+                time.sleep(rng.uniform(0, self.think_time))
+
+    def _report(self, elapsed: float, io_before, io_after) -> Dict:
+        """汇总吞吐、延迟分布、丢失更新与文件读写量"""
+        with open(DATA_FILE_PATH, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        lost = sum(
+            max(0, expected - (len(data[sid]["process_records"]) - 1))
+            for sid, expected in self.expected_writes.items()
+        )
+        total_ops = sum(len(values) for values in self.latencies.values())
+        report = {
+            "mode": self.mode,
+            "ops": total_ops,
+            "throughput": total_ops / elapsed if elapsed else 0.0,
+            "errors": self.errors,
+            "writes": sum(self.expected_writes.values()),
+            "lost_updates": lost,
+            "latency_ms": {
+                op: {
+                    "p50": percentile(values, 50) * 1000,
+                    "p95": percentile(values, 95) * 1000,
+                    "p99": percentile(values, 99) * 1000,
+                }
+                for op, values in self.latencies.items()
+            },
+        }
+        if io_before and io_after:
+            report["io_mb"] = {
+                key: (io_after[key] - io_before[key]) / 1024 / 1024 for key in ("read", "write")
+            }
+        return report
+
+
+def parse_mix(text: str) -> Dict[str, int]:
+    """解析操作比例（argparse 的 type），未知操作名或权重非法时报参数错误"""
+    mix = {}
+    for item in text.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f"未知操作：{name or item!r}，可选：{','.join(OPERATIONS)}")
+        try:
+            mix[name] = int(weight)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"操作 {name} 的权重不是整数：{weight!r}")
+        if mix[name] < 0:
+            raise argparse.ArgumentTypeError(f"操作 {name} 的权重不能为负数：{weight}")
+    if not any(mix.values()):
+        raise argparse.ArgumentTypeError("至少需要一个权重大于 0 的操作")
+    return mix
+
+
+def parse_modes(text: str) -> List[str]:
+    """解析模式列表（argparse 的 type），未知模式名时报参数错误"""
+    modes = [mode.strip() for mode in text.split(",")]
+    for mode in modes:
+        if mode not in MODES:
+            raise argparse.ArgumentTypeError(f"未知模式：{mode!r}，可选：{','.join(MODES)}")
+    return modes
+
+
+def print_reports(reports: List[Dict]) -> None:
+    """并排输出各模式的结果"""
+    header = f"{'指标':<22}" + "".join(f"{r['mode']:>18}" for r in reports)
+    print(header)
+    print("-" * len(header))
+
+    def row(label: str, getter: Callable[[Dict], str]) -> None:
+        print(f"{label:<22}" + "".join(f"{getter(r):>18}" for r in reports))
+
+    row("操作数", lambda r: str(r["ops"]))
+    row("吞吐（次/秒）", lambda r: f"{r['throughput']:.1f}")
+    row("成功写入（含阶段变更）", lambda r: str(r["writes"]))
+    row("丢失更新", lambda r: str(r["lost_updates"]))
+    row("异常", lambda r: str(r["errors"]))
+    for op in reports[0]["latency_ms"]:
+        for pct in ("p50", "p95", "p99"):
+            row(f"{op} {pct}（毫秒）", lambda r, op=op, pct=pct: f"{r['latency_ms'][op][pct]:.2f}")
+    if all("io_mb" in r for r in reports):
+        row("读取（MB）", lambda r: f"{r['io_mb']['read']:.1f}")
+        row("写入（MB）", lambda r: f"{r['io_mb']['write']:.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="并发压力测试")
+    parser.add_argument("--modes", type=parse_modes, default=",".join(MODES),
+                        help=f"逗号分隔，可选：{','.join(MODES)}")
+    parser.add_argument("--sessions", type=int, default=8, help="并发会话数")
+    parser.add_argument("--ops", type=int, default=100, help="每个会话的操作次数")
+    parser.add_argument("--students", type=int, default=500, help="测试数据学生数")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX,
+                        help=f"操作比例，如 {DEFAULT_MIX}；可选操作：{','.join(OPERATIONS)}")
+    parser.add_argument("--think-time", type=float, default=0.0, help="每次操作后的最长随机等待（秒）")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    parser.add_argument("--json", action="store_true", help="以 JSON 输出结果")
+    args = parser.parse_args()
+
+    # 无界面调用时 Streamlit 会对每个页面元素输出警告，压测时屏蔽
+    # （先加载配置，否则首次调用 Streamlit 时会按配置重置日志级别）
+    from streamlit import config
+    from streamlit.logger import set_log_level
+    config.get_config_options()
+    set_log_level("error")
+    # 预热：统计页依赖为延迟导入，避免首次导入耗时计入某一模式的延迟
+    import pandas  # noqa: F401
+    import altair  # noqa: F401
+    reports = [
+        LoadTest(mode, args.sessions, args.ops, args.students,
+                 args.mix, args.think_time, args.seed).run()
+        for mode in args.modes
+    ]
+    if args.json:
+        print(json.dumps(reports, ensure_ascii=False, indent=2))
+    else:
+        print_reports(reports)
+
+
+if __name__ == "__main__":
+    main()
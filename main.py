@@ -1,9 +1,47 @@
 """学生党建信息管理系统 - 主程序入口（Streamlit界面）"""
 import streamlit as st
 from utils.organization import PartyOrganization
+from utils.data_watcher import DataFileWatcher
 from utils.models import Student
-import json
-from utils.constants import SYSTEM_NAME, SYSTEM_ICON, PAGE_LAYOUT
+from utils.enums import PartyMemberStatus
+from utils.person_index import ROLE_NAMES, ROLE_TRAINER, ROLE_INTRODUCER
+from utils.timeutils import format_ts
+from utils.constants import (
+    SYSTEM_NAME, SYSTEM_ICON, PAGE_LAYOUT,
+    DATA_FILE_PATH, DATA_JOURNAL_PATH, DATA_WATCH_INTERVAL
+)
+
+
+@st.cache_resource
+def get_organization() -> PartyOrganization:
+    """所有会话共享同一个党组织对象，数据文件变化时由监听线程增量更新
+
+    缓存函数内输出的页面元素会在每次重跑时回放，因此这里不输出任何页面元素
+    """
+    org = PartyOrganization()
+    DataFileWatcher(org, DATA_FILE_PATH, DATA_JOURNAL_PATH).start()
+    return org
+
+
+@st.fragment(run_every=DATA_WATCH_INTERVAL)
+def watch_data_version(org: PartyOrganization) -> None:
+    """定时检查数据版本，其他会话或脚本修改数据后刷新当前页面"""
+    seen_version = st.session_state.setdefault("data_version", org.data_version)
+    if org.data_version != seen_version:
+        st.session_state["data_version"] = org.data_version
+        st.rerun(scope="app")
+
+
+def show_load_messages(org: PartyOrganization) -> None:
+    """每个会话只在首次打开时展示一次数据加载结果（人数按当前数据计算）"""
+    if st.session_state.get("load_messages_shown"):
+        return
+    st.session_state["load_messages_shown"] = True
+    if org.loaded:
+        st.success(f"✅ 成功加载 {len(org.member_infos)} 条学生党建信息")
+    for level, message in org.load_messages:
+        getattr(st, level)(message)
+
 
 def main():
     # 页面基础配置
@@ -13,8 +51,10 @@ def main():
         layout=PAGE_LAYOUT
     )
 
-    # 初始化核心业务类
-    org = PartyOrganization()
+    # 初始化核心业务类（跨会话共享）
+    org = get_organization()
+    watch_data_version(org)
+    show_load_messages(org)
 
     # 页面标题与分割线
     st.title(f"{SYSTEM_ICON} {SYSTEM_NAME}")
@@ -34,7 +74,8 @@ def main():
                 "6. 正式党员阶段操作",
                 "7. 查询学生党建信息",
                 "8. 统计各阶段人数",
-                "9. 删除学生党建信息（谨慎）"  # 确保这里是 "9. " 后1个空格
+                "9. 删除学生党建信息（谨慎）",  # 确保这里是 "9. " 后1个空格
+                "10. 历史版本与恢复"
             ]
         )
 
@@ -70,15 +111,15 @@ def main():
         tab1, tab2 = st.tabs(["递交入党申请书", "党组织谈话"])
 
         with tab1:
+            student_id = _pick_student(org, "submit_application_form", [PartyMemberStatus.APPLICATION])
             with st.form("submit_application_form", clear_on_submit=True):
-                student_id = st.text_input("学号（必填）", placeholder="如：2023001")
                 content = st.text_area("申请书核心内容（必填）", placeholder="简要描述入党动机、个人情况等，100字以内")
                 operator = st.text_input("操作人（必填）", placeholder="如：李老师")
                 st.form_submit_button("确认提交") and org.submit_application(student_id, content, operator)
 
         with tab2:
+            student_id = _pick_student(org, "talk_form", [PartyMemberStatus.APPLICATION])
             with st.form("talk_form", clear_on_submit=True):
-                student_id = st.text_input("学号（必填）", placeholder="如：2023001")
                 talker = st.text_input("谈话人（必填）", placeholder="如：王书记")
                 record = st.text_area("谈话记录（必填）", placeholder="简要记录谈话内容，100字以内")
                 st.form_submit_button("确认记录") and org.organization_talk(student_id, talker, record)
@@ -91,22 +132,23 @@ def main():
         tab1, tab2, tab3 = st.tabs(["确定为积极分子", "指定培养联系人", "添加考察记录"])
 
         with tab1:
+            student_id = _pick_student(org, "confirm_active_form", [PartyMemberStatus.APPLICATION])
             with st.form("confirm_active_form", clear_on_submit=True):
-                student_id = st.text_input("学号（必填）", placeholder="如：2023001")
                 recommenders = st.text_input("推荐人（必填，逗号分隔）", placeholder="如：张党员,李党员")
                 operator = st.text_input("操作人（必填）", placeholder="如：王支委")
                 st.form_submit_button("确认确定") and org.confirm_active_member(student_id, recommenders.split(","), operator)
 
         with tab2:
+            _show_assignee_suggestions(org, ROLE_TRAINER)
+            student_id = _pick_student(org, "assign_trainer_form", [PartyMemberStatus.ACTIVE_MEMBER])
             with st.form("assign_trainer_form", clear_on_submit=True):
-                student_id = st.text_input("学号（必填）", placeholder="如：2023001")
                 trainers = st.text_input("培养联系人（1-2人，逗号分隔）", placeholder="如：张党员,李党员")
                 operator = st.text_input("操作人（必填）", placeholder="如：王支委")
                 st.form_submit_button("确认指定") and org.assign_trainer(student_id, trainers.split(","), operator)
 
         with tab3:
+            student_id = _pick_student(org, "add_review_form", [PartyMemberStatus.ACTIVE_MEMBER])
             with st.form("add_review_form", clear_on_submit=True):
-                student_id = st.text_input("学号（必填）", placeholder="如：2023001")
                 content = st.text_area("考察记录（必填）", placeholder="简要记录考察情况，100字以内")
                 reviewer = st.text_input("考察人（必填）", placeholder="如：张培养人")
                 st.form_submit_button("确认添加") and org.add_active_review(student_id, content, reviewer)
@@ -119,22 +161,23 @@ def main():
         tab1, tab2, tab3 = st.tabs(["确定为发展对象", "添加政审材料", "指定入党介绍人"])
 
         with tab1:
+            student_id = _pick_student(org, "confirm_development_form", [PartyMemberStatus.ACTIVE_MEMBER])
             with st.form("confirm_development_form", clear_on_submit=True):
-                student_id = st.text_input("学号（必填）", placeholder="如：2023001")
                 remark = st.text_input("备注（可选）", placeholder="如：经1年培养，基本具备党员条件")
                 operator = st.text_input("操作人（必填）", placeholder="如：王支委")
                 st.form_submit_button("确认确定") and org.confirm_development_object(student_id, operator, remark)
 
         with tab2:
+            student_id = _pick_student(org, "add_political_form", [PartyMemberStatus.DEVELOPMENT_OBJECT])
             with st.form("add_political_form", clear_on_submit=True):
-                student_id = st.text_input("学号（必填）", placeholder="如：2023001")
                 content = st.text_area("政审结果（必填）", placeholder="简要记录政治审查情况，100字以内")
                 reviewer = st.text_input("审查人（必填）", placeholder="如：李负责人")
                 st.form_submit_button("确认添加") and org.add_political_review(student_id, content, reviewer)
 
         with tab3:
+            _show_assignee_suggestions(org, ROLE_INTRODUCER)
+            student_id = _pick_student(org, "assign_introducers_form", [PartyMemberStatus.DEVELOPMENT_OBJECT])
             with st.form("assign_introducers_form", clear_on_submit=True):
-                student_id = st.text_input("学号（必填）", placeholder="如：2023001")
                 introducers = st.text_input("入党介绍人（2人，逗号分隔）", placeholder="如：张党员,李党员")
                 operator = st.text_input("操作人（必填）", placeholder="如：王支委")
                 st.form_submit_button("确认指定") and org.assign_introducers(student_id, introducers.split(","), operator)
@@ -147,15 +190,15 @@ def main():
         tab1, tab2 = st.tabs(["接收为预备党员", "举行入党宣誓"])
 
         with tab1:
+            student_id = _pick_student(org, "confirm_probationary_form", [PartyMemberStatus.DEVELOPMENT_OBJECT])
             with st.form("confirm_probationary_form", clear_on_submit=True):
-                student_id = st.text_input("学号（必填）", placeholder="如：2023001")
                 vote_result = st.text_input("支部大会表决结果（必填）", placeholder="如：应到20人，实到18人，赞成18人")
                 operator = st.text_input("操作人（必填）", placeholder="如：王书记")
                 st.form_submit_button("确认接收") and org.confirm_probationary_member(student_id, vote_result, operator)
 
         with tab2:
+            student_id = _pick_student(org, "oath_form", [PartyMemberStatus.PROBATIONARY_MEMBER])
             with st.form("oath_form", clear_on_submit=True):
-                student_id = st.text_input("学号（必填）", placeholder="如：2023001")
                 oath_date = st.date_input("宣誓日期（必填）").strftime("%Y-%m-%d")
                 operator = st.text_input("操作人（必填）", placeholder="如：李组织委员")
                 st.form_submit_button("确认记录") and org.hold_oath_ceremony(student_id, oath_date, operator)
@@ -165,8 +208,8 @@ def main():
     # ------------------------------
     elif menu_option == "6. 正式党员阶段操作":
         st.subheader("🏆 正式党员阶段操作")
+        student_id = _pick_student(org, "confirm_formal_form", [PartyMemberStatus.PROBATIONARY_MEMBER])
         with st.form("confirm_formal_form", clear_on_submit=True):
-            student_id = st.text_input("学号（必填）", placeholder="如：2023001")
             conversion_date = st.date_input("转正日期（必填）").strftime("%Y-%m-%d")
             operator = st.text_input("操作人（必填）", placeholder="如：王书记")
             st.form_submit_button("确认转正") and org.confirm_formal_member(student_id, conversion_date, operator)
@@ -176,14 +219,29 @@ def main():
     # ------------------------------
     elif menu_option == "7. 查询学生党建信息":
         st.subheader("🔍 查询学生党建信息")
+        student_id = _pick_student(org, "query_form")
         with st.form("query_form", clear_on_submit=False):
-            student_id = st.text_input("请输入学号", placeholder="如：2023001")
             if st.form_submit_button("查询"):
                 if not student_id:
-                    st.error("❌ 请输入学号！")
+                    st.error("❌ 请选择学生！")
                     return
                 org.query_member(student_id)
 
+        with st.form("workload_form", clear_on_submit=False):
+            person = st.text_input("按人员查询工作量（推荐人/培养联系人/入党介绍人）", placeholder="如：张党员")
+            active_only = st.checkbox("仅统计在岗（学生仍处于对应阶段）", value=True)
+            if st.form_submit_button("查询工作量"):
+                person = person.strip()
+                if not person:
+                    st.error("❌ 请输入人员姓名！")
+                    return
+                workload = org.person_workload(person, active_only)
+                if not workload:
+                    st.info(f"📭 {person} 暂无推荐、培养或介绍记录")
+                for role, count in workload.items():
+                    students = org.person_students(person, role, active_only)
+                    st.write(f"• {ROLE_NAMES[role]}：{count} 人（{','.join(students)}）")
+
     # ------------------------------
     # 8. 统计各阶段人数
     # ------------------------------
@@ -196,25 +254,87 @@ def main():
     elif menu_option == "9. 删除学生党建信息（谨慎）":
         st.subheader("⚠️ 删除学生党建信息（不可逆）")
         st.warning("仅允许删除错误录入、学生毕业/退学等场景，请谨慎操作！")
-        file_path = r"student_party_data.json"
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-
         # 第一步：输入信息
-        student_id = st.text_input("学号（必填）")
+        student_id = _pick_student(org, "delete_form")
         operator = st.text_input("操作人（必填）")
         reason = st.text_input("删除原因（必填）")
 
         if st.button("提交删除申请"):
-            if student_id not in data:
-                st.error("❌ 该学不存在！")
-                return
-            else:
-                org.delete_student(student_id, operator, reason)
+            if org.delete_student(student_id, operator, reason):
                 st.success(f"✅ 成功删除学号 {student_id}的党建信息")
 
+    # ------------------------------
+    # 10. 历史版本与恢复
+    # ------------------------------
+    elif menu_option == "10. 历史版本与恢复":
+        st.subheader("🕰️ 历史版本与恢复")
+        versions = org.history.versions()  # 同时刷新快照列表（其他进程可能已写入新快照）
+        restores = org.history.restores()
+        st.caption(f"共 {len(org.history.snapshots)} 个全量快照，当前快照之后已记录 {org.history.pending} 次增量")
+        if not versions:
+            st.info("📭 暂无历史版本")
+            return
+
+        # 可恢复的版本（最新在前）：时间戳 -> 展示文本
+        restore_times = {item[0] for item in restores}
+        labels = {}
+        for ts, changed, deleted in reversed(versions):
+            if ts in restore_times:
+                labels[ts] = f"{format_ts(ts)}（恢复操作）"
+            elif changed or deleted:
+                labels[ts] = f"{format_ts(ts)}（变更 {changed} 条，删除 {deleted} 条）"
+            else:
+                labels[ts] = f"{format_ts(ts)}（全量快照）"
+        view_ts = st.selectbox("选择版本", list(labels), format_func=labels.get, key="history_version")
+
+        snapshot = org.view_at(view_ts)
+        if snapshot is None:
+            st.info("📭 该时间点之前没有历史快照")
+            return
+        st.write(f"**该时间点共有**：{len(snapshot)} 条学生党建信息")
+        st.dataframe({
+            "学号": list(snapshot),
+            "姓名": [info.student.name for info in snapshot.values()],
+            "状态": [info.status.value for info in snapshot.values()],
+        })
+
+        st.warning("恢复会用上述数据覆盖当前数据（恢复操作本身会记入历史，可再次恢复）")
+        operator = st.text_input("操作人（必填）", key="restore_operator")
+        if st.button("恢复到该时间点"):
+            if not operator:
+                st.error("❌ 请填写操作人！")
+                return
+            org.restore_to(view_ts, operator)
+
+        if restores:
+            st.write("**恢复记录**")
+            st.dataframe({
+                "恢复时间": [format_ts(item[0]) for item in restores],
+                "操作人": [item[1] for item in restores],
+                "恢复到": [format_ts(item[2]) for item in restores],
+            })
+
+
+def _pick_student(org: PartyOrganization, key: str, statuses=None) -> str:
+    """学号/姓名自动补全：按输入前缀筛选，仅列出处于该操作适用阶段的学生"""
+    prefix = st.text_input("搜索学号或姓名", key=f"{key}_search", placeholder="输入学号或姓名开头，如：2023 / 张")
+    candidates = dict(org.complete_students(prefix, statuses))
+    student_id = st.selectbox(
+        "学号（必填）", list(candidates), format_func=candidates.get,
+        index=None, key=f"{key}_student", placeholder="请选择学生"
+    )
+    return student_id or ""
+
 
+def _show_assignee_suggestions(org: PartyOrganization, role: str) -> None:
+    """展示负载均衡建议：当前在岗工作量最少的人员"""
+    suggestions = org.suggest_assignees(role)
+    if suggestions:
+        st.caption(f"💡 {ROLE_NAMES[role]}当前负担较轻：" +
+                   "，".join(f"{name}（{count}人）" for name, count in suggestions))
 
 
 if __name__ == "__main__":
     main()
+    # 本会话在本次运行中的保存已体现在页面上，无需再触发刷新
+    st.session_state["data_version"] = get_organization().data_version
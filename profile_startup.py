@@ -0,0 +1,142 @@
+"""冷启动性能分析：导入耗时与首屏渲染耗时
+
+用法：
+    python profile_startup.py                  # 输出本次测量结果
+    python profile_startup.py --check          # 超出预算或重型依赖被提前导入时返回非零退出码
+    python profile_startup.py --record FILE    # 追加一行 JSON 记录，便于跟踪历史趋势
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+from utils.constants import (
+    DATA_FILE_PATH, STARTUP_IMPORT_BUDGET_MS, FIRST_PAINT_BUDGET_MS,
+    LAZY_IMPORT_MODULES, PROFILE_REPEAT
+)
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 在全新解释器中渲染首页并输出耗时（毫秒），包含全部导入开销
+_FIRST_PAINT_SCRIPT = """
+import sys
+import time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=60).run()
+elapsed = (time.perf_counter() - start) * 1000
+if at.exception:
+    raise SystemExit(f"首屏渲染异常：{at.exception[0].message}")
+print(elapsed)
+"""
+
+
+def _run_python(args: List[str], cwd: str = PROJECT_DIR) -> subprocess.CompletedProcess:
+    """启动全新解释器（保证测量的是冷启动），项目目录始终在导入路径中"""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [PROJECT_DIR, os.environ.get("PYTHONPATH")])))
+    return subprocess.run(
+        [sys.executable, *args], cwd=cwd, env=env,
+        capture_output=True, text=True, check=True
+    )
+
+
+def measure_imports() -> Tuple[float, Dict[str, float], List[str]]:
+    """测量导入 main 模块的耗时
+
+    返回（总耗时，main 直接导入的各模块累计耗时，全部被导入的模块名），耗时单位毫秒
+    """
+    result = _run_python(["-X", "importtime", "-c", "import main"])
+    total_ms = 0.0
+    direct: Dict[str, float] = {}
+    imported: List[str] = []
+    for line in result.stderr.splitlines():
+        parts = line.split("|")
+        if not line.startswith("import time:") or not parts[1].strip().isdigit():
+            continue
+        name = parts[2].rstrip()
+        depth = (len(name) - len(name.lstrip()) - 1) // 2  # 每层嵌套缩进 2 个空格
+        cumulative_ms = int(parts[1]) / 1000
+        imported.append(name.strip())
+        if depth == 0 and name.strip() == "main":
+            total_ms = cumulative_ms
+        elif depth == 1:
+            # importtime 先输出子模块再输出父模块，main 之前的第 1 层条目即其直接导入
+            direct[name.strip()] = cumulative_ms
+        elif depth == 0:
+            direct.clear()
+    return total_ms, direct, imported
+
+
+def measure_first_paint() -> float:
+    """测量从解释器启动到首页渲染完成的耗时（毫秒）
+
+    在临时目录中使用数据文件副本运行，历史目录、变更日志与文件监听都不会触及真实数据
+    """
+    workdir = tempfile.mkdtemp(prefix="party_profile_")
+    try:
+        data_path = os.path.join(PROJECT_DIR, DATA_FILE_PATH)
+        if os.path.exists(data_path):
+            shutil.copy(data_path, os.path.join(workdir, DATA_FILE_PATH))
+        result = _run_python(["-c", _FIRST_PAINT_SCRIPT, os.path.join(PROJECT_DIR, "main.py")], cwd=workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def profile(repeat: int = PROFILE_REPEAT) -> Dict:
+    """重复测量并取最小值（排除系统抖动），同时记录被提前导入的重型依赖"""
+    import_runs = [measure_imports() for _ in range(repeat)]
+    import_ms, modules, imported = min(import_runs, key=lambda run: run[0])
+    first_paint_ms = min(measure_first_paint() for _ in range(repeat))
+    eager = [name for name in LAZY_IMPORT_MODULES if name in imported]
+    slowest = sorted(modules.items(), key=lambda item: -item[1])[:5]
+    return {
+        "time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "import_ms": round(import_ms, 1),
+        "first_paint_ms": round(first_paint_ms, 1),
+        "slowest_imports": [[name, round(ms, 1)] for name, ms in slowest],
+        "eager_heavy_imports": eager,
+    }
+
+
+def check(report: Dict) -> List[str]:
+    """对照预算检查测量结果，返回不达标项"""
+    failures = []
+    if report["import_ms"] > STARTUP_IMPORT_BUDGET_MS:
+        failures.append(f"导入耗时 {report['import_ms']}ms 超出预算 {STARTUP_IMPORT_BUDGET_MS}ms")
+    if report["first_paint_ms"] > FIRST_PAINT_BUDGET_MS:
+        failures.append(f"首屏耗时 {report['first_paint_ms']}ms 超出预算 {FIRST_PAINT_BUDGET_MS}ms")
+    if report["eager_heavy_imports"]:
+        failures.append(f"启动时提前导入了重型依赖：{','.join(report['eager_heavy_imports'])}")
+    return failures
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="冷启动性能分析")
+    parser.add_argument("--check", action="store_true", help="超出预算时返回非零退出码")
+    parser.add_argument("--record", metavar="FILE", help="将结果追加到 JSON Lines 文件")
+    parser.add_argument("--repeat", type=int, default=PROFILE_REPEAT, help="重复测量次数（取最小值）")
+    args = parser.parse_args()
+
+    report = profile(args.repeat)
+    print(f"导入耗时：{report['import_ms']}ms（预算 {STARTUP_IMPORT_BUDGET_MS}ms）")
+    print(f"首屏耗时：{report['first_paint_ms']}ms（预算 {FIRST_PAINT_BUDGET_MS}ms）")
+    print("最慢的顶层导入：" + "，".join(f"{name} {ms}ms" for name, ms in report["slowest_imports"]))
+
+    if args.record:
+        with open(args.record, "a", encoding="utf-8") as f:
+            f.write(json.dumps(report, ensure_ascii=False) + "\n")
+
+    failures = check(report)
+    for failure in failures:
+        print(f"❌ {failure}")
+    return 1 if args.check and failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,10 +7,19 @@ DEFAULT_ORG_NAME = "高校学生第一党支部"
 
 # 数据存储配置
 DATA_FILE_PATH = "student_party_data.json"  # 数据文件路径
+HISTORY_DIR_PATH = "student_party_history"  # 历史快照与增量目录
+SNAPSHOT_INTERVAL = 200  # 每累计多少次增量写一次全量快照（决定恢复耗时上界）
+DATA_JOURNAL_PATH = "student_party_data.changes.jsonl"  # 变更日志（供其他会话增量同步）
+DATA_JOURNAL_MAX_BYTES = 8 * 1024 * 1024  # 变更日志超过该大小时清空
+DATA_WATCH_INTERVAL = 1  # 检查其他会话/脚本数据变更的间隔（秒）
 
 # 界面配置
 PAGE_LAYOUT = "wide"  # Streamlit页面布局（wide/centered）
 MAX_RECORD_DISPLAY = 5  # 流程记录最多显示条数
+AUTOCOMPLETE_LIMIT = 20  # 学号/姓名自动补全最多候选数
+RENDER_CACHE_SIZE = 256  # 渲染缓存最多保留的页面数（统计页 + 学生详情页）
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"  # 时间展示/录入格式
+DATE_FORMAT = "%Y-%m-%d"  # 日期展示/录入格式
 
 # 业务规则常量
 MIN_TRAINERS_COUNT = 1  # 培养联系人最少人数
@@ -18,3 +27,9 @@ MAX_TRAINERS_COUNT = 2  # 培养联系人最多人数
 INTRODUCERS_REQUIRED = 2  # 入党介绍人必填人数
 PROBATION_PERIOD_DAYS = 365  # 预备期（天）
 REVIEW_REQUIRED_COUNT = 2  # 积极分子转发展对象所需考察次数
+
+# 冷启动性能预算（profile_startup.py --check 使用）
+STARTUP_IMPORT_BUDGET_MS = 600  # 导入主程序模块耗时上限（毫秒）
+FIRST_PAINT_BUDGET_MS = 3000  # 解释器启动到首页渲染完成耗时上限（毫秒）
+LAZY_IMPORT_MODULES = ("pandas", "altair", "watchdog")  # 启动时不应加载的重型依赖
+PROFILE_REPEAT = 3  # 重复测量次数（取最小值）
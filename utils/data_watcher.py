@@ -0,0 +1,110 @@
+"""数据文件监听：其他会话或脚本修改数据文件后，仅增量应用变化的记录
+
+每次保存除了整体替换数据文件，还会向变更日志追加一行，只包含本次变化的记录：
+    {"writer": 写入方标识, "stamp": [数据文件 mtime_ns, 字节数], "upserts": {学号: 记录}, "deletes": [学号]}
+其他进程从上次读到的位置往后读日志即可得到变更，无需重新解析整个数据文件；
+只有不经过本程序直接改动数据文件时（文件戳与日志对不上），才退回整文件比对。
+"""
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+from .constants import DATA_JOURNAL_MAX_BYTES
+
+
+def record_fingerprint(record: Dict) -> str:
+    """计算单条记录的指纹（用于识别哪些记录发生了变化）"""
+    payload = json.dumps(record, ensure_ascii=False, sort_keys=True)
+    return hashlib.md5(payload.encode("utf-8")).hexdigest()
+
+
+def file_stamp(path: str) -> Optional[Tuple[int, int]]:
+    """文件戳（修改时间纳秒, 字节数），用于判断文件是否为自己最近一次写入；文件不存在时返回 None"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class ChangeJournal:
+    """追加写入的变更日志（JSON Lines）"""
+
+    def __init__(self, path: str, max_bytes: int = DATA_JOURNAL_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+
+    def size(self) -> int:
+        try:
+            return os.path.getsize(self.path)
+        except FileNotFoundError:
+            return 0
+
+    def append(self, entry: Dict) -> None:
+        """追加一条变更；超过大小上限时清空（读取方会发现偏移越界并整文件比对一次）"""
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        if self.size() > self.max_bytes:
+            os.truncate(self.path, 0)
+
+    def read_new(self, offset: int) -> Tuple[List[Dict], int, bool]:
+        """读取 offset 之后的完整行，返回（变更列表，新偏移，是否需要整文件比对）
+
+        日志被清空或读到无法解析的行时，说明可能漏掉了变更，需要整文件比对
+        """
+        size = self.size()
+        if size < offset:
+            return [], size, True
+        if size == offset:
+            return [], offset, False
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            chunk = f.read(size - offset)
+        # 只处理以换行结尾的完整行，写了一半的末行留到下次
+        complete = chunk[:chunk.rfind(b"\n") + 1]
+        entries = []
+        for line in complete.splitlines():
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                return entries, size, True
+        return entries, offset + len(complete), False
+
+
+class DataFileWatcher:
+    """监听数据文件与变更日志，任一变化时调用 org.reload_changed()
+
+    watchdog 只会调用事件处理器的 dispatch()，因此无需继承其基类，
+    也就不必在导入本模块时加载 watchdog
+    """
+
+    def __init__(self, org, file_path: str, journal_path: str):
+        self.org = org
+        self.file_path = os.path.abspath(file_path)
+        self.watched = {self.file_path, os.path.abspath(journal_path)}
+        self.observer = None
+
+    def start(self) -> None:
+        """启动后台监听线程"""
+        from watchdog.observers import Observer
+
+        self.observer = Observer()
+        self.observer.schedule(self, os.path.dirname(self.file_path), recursive=False)
+        self.observer.daemon = True
+        self.observer.start()
+
+    def stop(self) -> None:
+        """停止监听"""
+        if self.observer is None:
+            return
+        self.observer.stop()
+        self.observer.join()
+
+    def dispatch(self, event) -> None:
+        """仅关注数据文件与变更日志本身的创建、修改与原子替换"""
+        if event.is_directory or event.event_type not in ("created", "modified", "moved"):
+            return
+        paths = {event.src_path, getattr(event, "dest_path", "")}
+        if self.watched & {os.path.abspath(p) for p in paths if p}:
+            self.org.reload_changed()
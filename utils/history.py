@@ -0,0 +1,174 @@
+"""历史版本：定期全量快照 + 逐次增量记录，支持查看或恢复任意时间点的数据
+
+目录结构（均为本地文件）：
+    snapshot_<时间戳>_<序号>.json.gz   全量快照（gzip 压缩）
+    deltas_<时间戳>_<序号>.jsonl       该快照之后的增量，每行一次保存：
+                                       {"ts": 时间戳, "upserts": {学号: 记录}, "deletes": [学号]}
+                                       恢复操作另带 "operator"（操作人）与 "restored_to"（恢复到的时间点）
+
+多个进程可能共用同一目录，因此每次读写前都会重新列出目录，追加到最新的增量文件。
+
+恢复到时间点 T：取 T 之前最近的快照，再重放其后不晚于 T 的增量；
+每个快照最多跟随 SNAPSHOT_INTERVAL 条增量，因此恢复耗时有上界。
+"""
+import gzip
+import json
+import os
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from .constants import HISTORY_DIR_PATH, SNAPSHOT_INTERVAL
+from .timeutils import now_ts
+
+_SNAPSHOT_PATTERN = re.compile(r"^snapshot_(\d+)_(\d+)\.json\.gz$")
+
+
+class DataHistory:
+    """数据历史版本存储"""
+
+    def __init__(self, root: str = HISTORY_DIR_PATH, interval: int = SNAPSHOT_INTERVAL):
+        self.root = root
+        self.interval = interval
+        self.snapshots: List[Tuple[int, int]] = []  # [(时间戳, 序号)]，按序号升序
+        self.pending = 0  # 当前增量文件中的记录数
+        self._refresh()
+
+    # ------------------------------
+    # 写入
+    # ------------------------------
+    def sync(self, data: Dict) -> None:
+        """使历史与数据文件一致：尚无快照时写入基线快照；
+        最新历史状态与 data 不一致时（如数据文件在程序外被修改）记录两者的差异
+        """
+        self._refresh()
+        if not self.snapshots:
+            self._write_snapshot(data, now_ts())
+            return
+        latest = self._replay(self.snapshots[-1])
+        upserts = {sid: record for sid, record in data.items() if latest.get(sid) != record}
+        deletes = [sid for sid in latest if sid not in data]
+        self.record(upserts, deletes, data)
+
+    def record(self, upserts: Dict[str, Dict], deletes: List[str], data: Dict,
+               ts: Optional[int] = None, meta: Optional[Dict] = None) -> None:
+        """记录一次保存的增量；累计满 interval 条后写入新的全量快照
+
+        meta 为附加字段（如恢复操作的操作人），带 meta 时即使没有变化也会记录
+        """
+        if not upserts and not deletes and not meta:
+            return
+        ts = now_ts() if ts is None else ts
+        self._refresh()  # 其他进程可能已写入更新的快照
+        if not self.snapshots:
+            self._write_snapshot(data, ts)
+            return
+        entry = {"ts": ts, "upserts": upserts, "deletes": deletes, **(meta or {})}
+        with open(self._deltas_path(self.snapshots[-1]), "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self.pending += 1
+        if self.pending >= self.interval:
+            self._write_snapshot(data, ts)
+
+    # ------------------------------
+    # 读取
+    # ------------------------------
+    def state_at(self, ts: int) -> Optional[Dict]:
+        """返回时间点 ts 的全量数据；早于最早快照时返回 None"""
+        self._refresh()
+        base = None
+        for snapshot in self.snapshots:
+            if snapshot[0] <= ts:
+                base = snapshot
+        if base is None:
+            return None
+        return self._replay(base, ts)
+
+    def versions(self) -> List[Tuple[int, int, int]]:
+        """全部可恢复的时间点：[(时间戳, 变更条数, 删除条数)]，按时间升序
+
+        恢复按秒定位，同一秒内的多次保存合并为一个版本；快照本身不计变更
+        """
+        self._refresh()
+        counts: Dict[int, List[int]] = {}
+        for snapshot in self.snapshots:
+            counts.setdefault(snapshot[0], [0, 0])
+            for delta in self._read_deltas(snapshot):
+                count = counts.setdefault(delta["ts"], [0, 0])
+                count[0] += len(delta["upserts"])
+                count[1] += len(delta["deletes"])
+        return [(ts, count[0], count[1]) for ts, count in sorted(counts.items())]
+
+    def restores(self) -> List[Tuple[int, str, int]]:
+        """全部恢复操作：[(恢复时间, 操作人, 恢复到的时间点)]，按时间升序"""
+        self._refresh()
+        return [
+            (delta["ts"], delta["operator"], delta["restored_to"])
+            for snapshot in self.snapshots
+            for delta in self._read_deltas(snapshot)
+            if "restored_to" in delta
+        ]
+
+    # ------------------------------
+    # 内部辅助方法（私有）
+    # ------------------------------
+    def _refresh(self) -> None:
+        """重新列出快照，并统计最新增量文件的行数"""
+        snapshots = []
+        if os.path.isdir(self.root):
+            for name in os.listdir(self.root):
+                match = _SNAPSHOT_PATTERN.match(name)
+                if match:
+                    snapshots.append((int(match.group(1)), int(match.group(2))))
+        # 多个进程同时写快照时序号可能相同，再按时间戳排序保证顺序确定
+        self.snapshots = sorted(snapshots, key=lambda item: (item[1], item[0]))
+        self.pending = 0
+        if self.snapshots:
+            try:
+                with open(self._deltas_path(self.snapshots[-1]), "rb") as f:
+                    self.pending = f.read().count(b"\n")
+            except FileNotFoundError:
+                pass
+
+    def _replay(self, snapshot: Tuple[int, int], until: Optional[int] = None) -> Dict:
+        """读取快照并重放其后不晚于 until 的增量（until 为 None 时重放全部）"""
+        with gzip.open(self._snapshot_path(snapshot), "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        for delta in self._read_deltas(snapshot):
+            if until is not None and delta["ts"] > until:
+                break
+            data.update(delta["upserts"])
+            for sid in delta["deletes"]:
+                data.pop(sid, None)
+        return data
+
+    def _write_snapshot(self, data: Dict, ts: int) -> None:
+        """写入全量快照并开始新的增量文件"""
+        os.makedirs(self.root, exist_ok=True)
+        snapshot = (ts, self.snapshots[-1][1] + 1 if self.snapshots else 0)
+        tmp_path = f"{self._snapshot_path(snapshot)}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self._snapshot_path(snapshot))
+        self.snapshots.append(snapshot)
+        self.pending = 0
+
+    def _read_deltas(self, snapshot: Tuple[int, int]) -> List[Dict]:
+        """读取某快照之后的全部增量（忽略写了一半的末行）"""
+        deltas = []
+        try:
+            with open(self._deltas_path(snapshot), "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        deltas.append(json.loads(line))
+                    except ValueError:
+                        break
+        except FileNotFoundError:
+            pass
+        return deltas
+
+    def _snapshot_path(self, snapshot: Tuple[int, int]) -> str:
+        return os.path.join(self.root, f"snapshot_{snapshot[0]}_{snapshot[1]}.json.gz")
+
+    def _deltas_path(self, snapshot: Tuple[int, int]) -> str:
+        return os.path.join(self.root, f"deltas_{snapshot[0]}_{snapshot[1]}.jsonl")
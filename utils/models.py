@@ -1,7 +1,10 @@
 """数据模型类：定义核心数据结构"""
-from datetime import datetime
 from typing import List, Dict
 from .enums import PartyMemberStatus, MaterialType
+from .timeutils import now_ts, to_ts
+
+# extra_info 中以时间戳存储的日期字段
+EXTRA_DATE_FIELDS = ("oath_time", "conversion_time", "party_age_start")
 
 class Student:
     """学生基础信息模型"""
@@ -41,7 +44,7 @@ class PartyMemberInfo:
     def __init__(self, student: Student):
         self.student = student                          # 关联学生对象
         self.status = PartyMemberStatus.APPLICATION     # 初始状态：申请入党阶段
-        self.create_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")  # 录入时间
+        self.create_time = now_ts()                     # 录入时间（时间戳）
         self.materials: Dict[MaterialType, Dict] = {}   # 已提交材料
         self.process_records: List[Dict] = []           # 流程记录
         self.extra_info: Dict = {}                      # 额外信息（推荐人、培养人等）
@@ -49,12 +52,12 @@ class PartyMemberInfo:
     def add_material(self, material_type: MaterialType, content: str, reviewer: str = "admin") -> None:
         """添加党建材料"""
         self.materials[material_type] = {
-            "submit_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "submit_time": now_ts(),
             "content": content,
             "reviewer": reviewer,
             "review_status": "已审核"
         }
-        self.add_process_record(f"提交{material_type.value}", f"操作人：{reviewer}")
+        self.add_process_record(f"提交{material_type.value}", f"操作人：{reviewer}", reviewer)
 
     def update_status(self, new_status: PartyMemberStatus, operator: str, remark: str = "") -> None:
         """更新党员发展状态"""
@@ -62,16 +65,20 @@ class PartyMemberInfo:
         self.status = new_status
         self.add_process_record(
             f"状态变更：{old_status.value} → {new_status.value}",
-            f"操作人：{operator}，备注：{remark}"
+            f"操作人：{operator}，备注：{remark}",
+            operator
         )
 
-    def add_process_record(self, title: str, detail: str) -> None:
+    def add_process_record(self, title: str, detail: str, operator: str = "") -> None:
         """添加流程记录"""
-        self.process_records.append({
-            "time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        record = {
+            "time": now_ts(),
             "title": title,
             "detail": detail
-        })
+        }
+        if operator:
+            record["operator"] = operator
+        self.process_records.append(record)
 
     def to_dict(self) -> Dict:
         """对象转字典（序列化）"""
@@ -86,12 +93,21 @@ class PartyMemberInfo:
 
     @staticmethod
     def from_dict(data: Dict) -> "PartyMemberInfo":
-        """字典转对象（反序列化）"""
+        """字典转对象（反序列化，旧数据中的时间字符串统一转为时间戳）"""
         student = Student.from_dict(data["student"])
         info = PartyMemberInfo(student)
         info.status = PartyMemberStatus[data["status"]]
-        info.create_time = data["create_time"]
+        info.create_time = to_ts(data["create_time"])
         info.materials = {MaterialType[mt_name]: val for mt_name, val in data["materials"].items()}
+        for val in info.materials.values():
+            val["submit_time"] = to_ts(val["submit_time"])
         info.process_records = data["process_records"]
+        for record in info.process_records:
+            record["time"] = to_ts(record["time"])
         info.extra_info = data["extra_info"]
+        for review in info.extra_info.get("active_member_reviews", []):
+            review["review_time"] = to_ts(review["review_time"])
+        for key in EXTRA_DATE_FIELDS:
+            if info.extra_info.get(key):
+                info.extra_info[key] = to_ts(info.extra_info[key])
         return info
\ No newline at end of file
@@ -1,56 +1,261 @@
 """党组织管理类：封装所有核心业务逻辑"""
-import pandas as pd  # 新增这行（放在文件顶部的导入区）
+import functools
 import json
+import os
+import threading
+import uuid
 from datetime import datetime
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Tuple
 import streamlit as st
-import altair as alt
 
-from .models import Student, PartyMemberInfo
+from .models import Student, PartyMemberInfo, EXTRA_DATE_FIELDS
 from .enums import PartyMemberStatus, MaterialType
+from .data_watcher import ChangeJournal, record_fingerprint, file_stamp
+from .history import DataHistory
+from .render_cache import RenderCache
+from .prefix_index import StudentPrefixIndex
+from .person_index import PersonIndex, normalize_names, ROLE_ACTIVE_STATUSES
+from .time_index import TimeIndex, record_operator
+from .timeutils import TimeValue, now_ts, to_ts, format_ts
 from .constants import (
-    DATA_FILE_PATH, DEFAULT_ORG_NAME,
+    DATA_FILE_PATH, DATA_JOURNAL_PATH, DEFAULT_ORG_NAME, DATE_FORMAT,
     MIN_TRAINERS_COUNT, MAX_TRAINERS_COUNT,
     INTRODUCERS_REQUIRED, PROBATION_PERIOD_DAYS,
     REVIEW_REQUIRED_COUNT, MAX_RECORD_DISPLAY
 )
 
+
+def _locked(method):
+    """在组织锁内执行：所有会话与文件监听线程共享同一对象，
+    校验状态 → 修改 → 保存（或遍历数据生成页面内容）期间不会与其他线程交错
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
 class PartyOrganization:
     """党组织管理核心类：处理所有业务逻辑"""
 
     def __init__(self, org_name: str = DEFAULT_ORG_NAME):
         self.org_name = org_name
         self.member_infos: Dict[str, PartyMemberInfo] = {}  # 学号 -> 党建信息
+        self.person_index = PersonIndex()  # 推荐人/培养人/介绍人 -> 学生
+        self.student_index = StudentPrefixIndex()  # 学号/姓名前缀 -> 学生（按阶段分组）
+        self.record_index = TimeIndex()  # 全部流程记录按时间排序（事件键为记录序号）
+        self.material_index = TimeIndex()  # 全部材料按提交时间排序（事件键为材料类型名）
+        self.data_version = 0  # 数据版本号：每次保存或外部变更后递增
+        self.member_versions: Dict[str, int] = {}  # 学号 -> 该学生最近一次变更时的数据版本号
+        self.status_version = 0  # 阶段分布版本号：仅在学生增删或阶段变化时递增
+        self._statuses: Dict[str, PartyMemberStatus] = {}  # 学号 -> 已登记的发展阶段
+        self.render_cache = RenderCache()  # 统计页与详情页的渲染结果缓存
+        self._fingerprints: Dict[str, str] = {}  # 学号 -> 记录指纹（识别外部变更）
+        self._writer_id = uuid.uuid4().hex  # 本对象在变更日志中的写入方标识
+        self._journal = ChangeJournal(DATA_JOURNAL_PATH)  # 变更日志（仅含每次变化的记录）
+        self._journal_offset = 0  # 变更日志已读取到的位置
+        self._file_stamp = None  # 已知的数据文件戳（自己写入或已同步到的版本）
+        self.history = DataHistory()  # 快照 + 增量历史（支持按时间点恢复）
+        self._lock = threading.RLock()  # 文件监听线程与页面线程互斥
+        self.loaded = False  # 是否已成功读取数据文件
+        self.load_messages: List[Tuple[str, str]] = []  # 加载时的异常提示 [(级别, 文本)]，由页面展示
         self.load_data()  # 初始化时自动加载数据
 
     def load_data(self) -> None:
-        """从JSON文件加载数据"""
+        """从JSON文件加载数据
+
+        对象在会话间共享，加载结果不直接输出页面元素，而是记入 loaded / load_messages 由页面展示
+        """
+        self.load_messages = []
         try:
-            with open(DATA_FILE_PATH, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                self.member_infos = {
-                    sid: PartyMemberInfo.from_dict(member_data)
-                    for sid, member_data in data.items()
-                }
-            st.success(f"✅ 成功加载 {len(self.member_infos)} 条学生党建信息")
+            with self._lock:
+                # 先记下日志位置再读文件：期间其他进程的变更之后会按日志重放（重复应用无副作用）
+                self._journal_offset = self._journal.size()
+                self._file_stamp = file_stamp(DATA_FILE_PATH)
+                with open(DATA_FILE_PATH, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                # 指纹与历史均按文件原样计算（from_dict 会就地转换旧格式时间）
+                self._fingerprints = {sid: record_fingerprint(val) for sid, val in data.items()}
+                history_error = self._sync_history(data)
+                self._replace_all(data)
+            self.loaded = True
+            if history_error:
+                self.load_messages.append(("warning", f"⚠️ 数据已加载，但同步历史版本失败：{history_error}"))
         except FileNotFoundError:
-            st.info(f"📁 未找到数据文件，将创建新文件：{DATA_FILE_PATH}")
+            self.load_messages.append(("info", f"📁 未找到数据文件，将创建新文件：{DATA_FILE_PATH}"))
         except Exception as e:
-            st.error(f"❌ 加载数据失败：{str(e)}")
-
-    def save_data(self) -> None:
-        """保存数据到JSON文件"""
+            self.load_messages.append(("error", f"❌ 加载数据失败：{str(e)}"))
+
+    def save_data(self, history_meta: Optional[Dict] = None) -> None:
+        """保存数据到JSON文件（history_meta 为写入历史版本的附加字段，如恢复操作人）"""
+        with self._lock:
+            try:
+                # 序列化所有对象
+                data = {sid: member_info.to_dict() for sid, member_info in self.member_infos.items()}
+                fingerprints = {sid: record_fingerprint(val) for sid, val in data.items()}
+                # 先合并其他写入方尚未同步的变更，避免整文件覆盖掉它们；
+                # 同一学生在本地也有修改时以本次保存为准
+                local = {sid for sid, fp in fingerprints.items() if self._fingerprints.get(sid) != fp}
+                local.update(sid for sid in self._fingerprints if sid not in fingerprints)
+                ext_upserts, ext_deletes, history_data = self._pull_changes()
+                ext_upserts = {sid: record for sid, record in ext_upserts.items() if sid not in local}
+                ext_deletes = [sid for sid in ext_deletes if sid not in local]
+                for sid, record in ext_upserts.items():
+                    fingerprints[sid] = record_fingerprint(record)
+                    data[sid] = record
+                for sid in ext_deletes:
+                    fingerprints.pop(sid, None)
+                    data.pop(sid, None)
+                self._apply_changes(ext_upserts, ext_deletes, history_data)
+                # 先更新指纹，文件监听收到自身写入时不会重复应用
+                upserts = {sid: data[sid] for sid, fp in fingerprints.items() if self._fingerprints.get(sid) != fp}
+                deletes = [sid for sid in self._fingerprints if sid not in fingerprints]
+                self._fingerprints = fingerprints
+                self.data_version += 1
+                # 先写临时文件再原子替换，避免其他会话读到写了一半的文件
+                # 临时文件名带进程与线程号，多个写入方同时保存时互不覆盖
+                tmp_path = f"{DATA_FILE_PATH}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(data, f, ensure_ascii=False, indent=2)
+                os.replace(tmp_path, DATA_FILE_PATH)
+                # 记下自己写出的文件戳，文件监听收到这次写入时直接跳过
+                self._file_stamp = file_stamp(DATA_FILE_PATH)
+                if upserts or deletes:
+                    self._journal.append({
+                        "writer": self._writer_id, "stamp": self._file_stamp,
+                        "upserts": upserts, "deletes": deletes
+                    })
+            except Exception as e:
+                st.error(f"❌ 保存数据失败：{str(e)}")
+                return
+            # 数据文件已替换，历史记录失败不影响本次保存
+            try:
+                # 仅记录本次变化的记录，历史存储随变更量增长
+                self.history.record(upserts, deletes, data, meta=history_meta)
+            except Exception as e:
+                st.warning(f"⚠️ 数据已保存，但记录历史版本失败：{str(e)}")
+
+    def reload_changed(self) -> Tuple[int, int]:
+        """增量同步其他会话或脚本的修改，返回（变更数，删除数）
+
+        优先按变更日志只应用变化的记录；数据文件戳与已知版本不一致时（如脚本直接改文件）
+        才整文件比对。读取与比对都在锁内完成，不会与本进程的保存交错。
+        由文件监听线程调用，因此不输出任何页面元素。
+        """
+        with self._lock:
+            return self._apply_changes(*self._pull_changes())
+
+    def _pull_changes(self) -> Tuple[Dict[str, Dict], List[str], Optional[Dict]]:
+        """读取其他写入方尚未同步的变更：返回（变更记录，删除学号，需补记历史的完整数据）
+
+        只读取、不应用（调用方需持有锁）；最后一项仅在整文件比对时非 None
+        """
+        upserts: Dict[str, Dict] = {}
+        deletes: List[str] = []
+        entries, self._journal_offset, resync = self._journal.read_new(self._journal_offset)
+        for entry in entries:
+            if entry["writer"] == self._writer_id:
+                continue
+            for sid, record in entry["upserts"].items():
+                upserts[sid] = record
+                if sid in deletes:
+                    deletes.remove(sid)
+            for sid in entry["deletes"]:
+                upserts.pop(sid, None)
+                deletes.append(sid)
+            self._file_stamp = tuple(entry["stamp"]) if entry["stamp"] else None
+
+        stamp = file_stamp(DATA_FILE_PATH)
+        if stamp is not None and (resync or stamp != self._file_stamp):
+            try:
+                with open(DATA_FILE_PATH, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except ValueError:
+                data = None  # 文件正被非原子地写入，等下一次变化事件
+            if data is not None:
+                # 整文件比对以文件为准，覆盖日志得到的结果
+                fingerprints = {sid: record_fingerprint(val) for sid, val in data.items()}
+                upserts = {
+                    sid: data[sid] for sid, fp in fingerprints.items()
+                    if self._fingerprints.get(sid) != fp
+                }
+                deletes = [sid for sid in self._fingerprints if sid not in fingerprints]
+                self._file_stamp = stamp
+                # 文件在程序外被修改：没有写入方记录这次变化的历史，由应用方补记
+                return upserts, deletes, data
+
+        return upserts, deletes, None
+
+    def _apply_changes(self, upserts: Dict[str, Dict], deletes: List[str],
+                       history_data: Optional[Dict] = None) -> Tuple[int, int]:
+        """将外部变更应用到内存与各索引（调用方需持有锁）
+
+        history_data 为变更后的完整数据，传入时同时把本次变更记入历史版本
+        """
+        # 指纹按原样计算（from_dict 会就地转换旧格式时间）；与已知内容相同的记录无需重复应用
+        fingerprints = {sid: record_fingerprint(record) for sid, record in upserts.items()}
+        upserts = {sid: record for sid, record in upserts.items() if self._fingerprints.get(sid) != fingerprints[sid]}
+        deletes = [sid for sid in deletes if sid in self.member_infos]
+        if not upserts and not deletes:
+            return 0, 0
+        if history_data is not None:
+            self._sync_history(history_data)
+        self.data_version += 1
+        for sid, record in upserts.items():
+            member_info = PartyMemberInfo.from_dict(record)
+            self.member_infos[sid] = member_info
+            self._fingerprints[sid] = fingerprints[sid]
+            self._unindex_member(sid)
+            self._index_member(member_info)
+            self.member_versions[sid] = self.data_version
+        for sid in deletes:
+            self.member_infos.pop(sid, None)
+            self._fingerprints.pop(sid, None)
+            self._unindex_member(sid)
+            self._set_status(sid, None)
+        return len(upserts), len(deletes)
+
+    def _sync_history(self, data: Dict) -> Optional[str]:
+        """使历史版本与数据文件内容一致，返回失败原因（成功时为 None）
+
+        可能由文件监听线程调用，因此不输出页面元素，由调用方决定是否提示
+        """
         try:
-            # 序列化所有对象
-            data = {sid: member_info.to_dict() for sid, member_info in self.member_infos.items()}
-            with open(DATA_FILE_PATH, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            self.history.sync(data)
+            return None
         except Exception as e:
-            st.error(f"❌ 保存数据失败：{str(e)}")
+            return str(e)
+
+    # ------------------------------
+    # 历史版本：查看与恢复
+    # ------------------------------
+    def view_at(self, ts: TimeValue) -> Optional[Dict[str, PartyMemberInfo]]:
+        """查看某时间点的全部党建信息（不影响当前数据）；无可用历史时返回 None"""
+        data = self.history.state_at(to_ts(ts))
+        if data is None:
+            return None
+        return {sid: PartyMemberInfo.from_dict(member_data) for sid, member_data in data.items()}
+
+    @_locked
+    def restore_to(self, ts: TimeValue, operator: str) -> bool:
+        """将数据恢复到某时间点（恢复本身也记入历史，可再次撤销）"""
+        data = self.history.state_at(to_ts(ts))
+        if data is None:
+            st.error(f"❌ {format_ts(ts)} 之前没有历史快照，无法恢复")
+            return False
+
+        # 先同步尚未应用的外部变更，恢复结果随后整体覆盖它们
+        self.reload_changed()
+        self._replace_all(data)
+        self.save_data(history_meta={"operator": operator, "restored_to": to_ts(ts)})
+        st.success(f"✅ 已由 {operator} 将数据恢复到 {format_ts(ts)}，共 {len(self.member_infos)} 条学生党建信息")
+        return True
 
     # ------------------------------
     # 基础操作：新增、删除
     # ------------------------------
+    @_locked
     def add_student(self, student: Student) -> bool:
         """新增学生党建信息"""
         if student.student_id in self.member_infos:
@@ -61,21 +266,22 @@ class PartyOrganization:
         member_info = PartyMemberInfo(student)
         member_info.add_process_record("初始化党建信息", "录入系统，进入申请入党阶段")
         self.member_infos[student.student_id] = member_info
-        self.save_data()
+        self._commit(member_info)
         st.success(f"✅ 成功添加 {student.name}（学号：{student.student_id}）的党建信息")
         return True
 
+    @_locked
     def delete_student(self, student_id: str, operator: str, reason: str) -> bool:
         """真正执行删除（UI 不在这里做）"""
+        if student_id not in self.member_infos:
+            st.error(f"❌ 未找到学号 {student_id} 的党建信息")
+            return False
 
-
-        # 执行删除
-        file_path = r"student_party_data.json"
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        data.pop(student_id, None)
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=4)
+        # 执行删除（内存、索引与数据文件保持一致）
+        self.member_infos.pop(student_id)
+        self._unindex_member(student_id)
+        self._set_status(student_id, None)
+        self.save_data()
 
         # with st.expander("查看删除记录"):
         #     st.write(f"操作人：{operator}")
@@ -86,6 +292,7 @@ class PartyOrganization:
     # ------------------------------
     # 申请入党阶段操作
     # ------------------------------
+    @_locked
     def submit_application(self, student_id: str, content: str, operator: str) -> bool:
         """递交入党申请书"""
         member_info = self._get_member_info(student_id)
@@ -97,10 +304,11 @@ class PartyOrganization:
             return False
 
         member_info.add_material(MaterialType.APPLICATION_FORM, content, operator)
-        self.save_data()
+        self._commit(member_info)
         st.success(f"✅ 学号 {student_id} 已成功提交入党申请书")
         return True
 
+    @_locked
     def organization_talk(self, student_id: str, talker: str, record: str) -> bool:
         """记录党组织谈话"""
         member_info = self._get_member_info(student_id)
@@ -113,13 +321,14 @@ class PartyOrganization:
             return False
 
         member_info.add_material(MaterialType.TALK_RECORD, record, talker)
-        self.save_data()
+        self._commit(member_info)
         st.success(f"✅ 已完成对学号 {student_id} 的党组织谈话，谈话人：{talker}")
         return True
 
     # ------------------------------
     # 入党积极分子阶段操作
     # ------------------------------
+    @_locked
     def confirm_active_member(self, student_id: str, recommenders: List[str], operator: str) -> bool:
         """确定为入党积极分子"""
         member_info = self._get_member_info(student_id)
@@ -134,6 +343,11 @@ class PartyOrganization:
             st.error(f"❌ 需先完成党组织谈话，再确定入党积极分子")
             return False
 
+        recommenders = normalize_names(recommenders)
+        if not recommenders:
+            st.error(f"❌ 请填写推荐人")
+            return False
+
         # 记录推荐人并更新状态
         member_info.extra_info["recommenders"] = recommenders
         member_info.update_status(
@@ -141,10 +355,11 @@ class PartyOrganization:
             operator,
             remark=f"经支委会讨论，确定为入党积极分子，推荐人：{','.join(recommenders)}"
         )
-        self.save_data()
+        self._commit(member_info)
         st.success(f"✅ 学号 {student_id} 已确定为入党积极分子")
         return True
 
+    @_locked
     def assign_trainer(self, student_id: str, trainers: List[str], operator: str) -> bool:
         """指定培养联系人"""
         member_info = self._get_member_info(student_id)
@@ -155,6 +370,7 @@ class PartyOrganization:
         if member_info.status != PartyMemberStatus.ACTIVE_MEMBER:
             st.error(f"❌ 当前状态为 {member_info.status.value}，仅入党积极分子可指定培养联系人")
             return False
+        trainers = normalize_names(trainers)
         if not (MIN_TRAINERS_COUNT <= len(trainers) <= MAX_TRAINERS_COUNT):
             st.error(f"❌ 培养联系人需{MIN_TRAINERS_COUNT}-{MAX_TRAINERS_COUNT}名正式党员，当前数量：{len(trainers)}")
             return False
@@ -163,12 +379,14 @@ class PartyOrganization:
         member_info.extra_info["trainers"] = trainers
         member_info.add_process_record(
             "指定培养联系人",
-            f"培养联系人：{','.join(trainers)}，操作人：{operator}"
+            f"培养联系人：{','.join(trainers)}，操作人：{operator}",
+            operator
         )
-        self.save_data()
+        self._commit(member_info)
         st.success(f"✅ 已为学号 {student_id} 指定培养联系人：{','.join(trainers)}")
         return True
 
+    @_locked
     def add_active_review(self, student_id: str, content: str, reviewer: str) -> bool:
         """添加积极分子考察记录"""
         member_info = self._get_member_info(student_id)
@@ -182,19 +400,20 @@ class PartyOrganization:
         # 记录考察记录
         reviews = member_info.extra_info.get("active_member_reviews", [])
         reviews.append({
-            "review_time": datetime.now().strftime("%Y-%m-%d"),
+            "review_time": now_ts(),
             "reviewer": reviewer,
             "content": content
         })
         member_info.extra_info["active_member_reviews"] = reviews
-        member_info.add_process_record("添加积极分子考察记录", f"考察人：{reviewer}")
-        self.save_data()
+        member_info.add_process_record("添加积极分子考察记录", f"考察人：{reviewer}", reviewer)
+        self._commit(member_info)
         st.success(f"✅ 已添加学号 {student_id} 的入党积极分子考察记录")
         return True
 
     # ------------------------------
     # 发展对象阶段操作
     # ------------------------------
+    @_locked
     def confirm_development_object(self, student_id: str, operator: str, remark: str = "") -> bool:
         """确定为发展对象"""
         member_info = self._get_member_info(student_id)
@@ -214,10 +433,11 @@ class PartyOrganization:
 
         # 更新状态
         member_info.update_status(PartyMemberStatus.DEVELOPMENT_OBJECT, operator, remark)
-        self.save_data()
+        self._commit(member_info)
         st.success(f"✅ 学号 {student_id} 已确定为发展对象")
         return True
 
+    @_locked
     def add_political_review(self, student_id: str, content: str, reviewer: str) -> bool:
         """添加政治审查材料"""
         member_info = self._get_member_info(student_id)
@@ -229,10 +449,11 @@ class PartyOrganization:
             return False
 
         member_info.add_material(MaterialType.POLITICAL_REVIEW, content, reviewer)
-        self.save_data()
+        self._commit(member_info)
         st.success(f"✅ 已添加学号 {student_id} 的政治审查材料")
         return True
 
+    @_locked
     def assign_introducers(self, student_id: str, introducers: List[str], operator: str) -> bool:
         """指定入党介绍人"""
         member_info = self._get_member_info(student_id)
@@ -243,6 +464,7 @@ class PartyOrganization:
         if member_info.status != PartyMemberStatus.DEVELOPMENT_OBJECT:
             st.error(f"❌ 当前状态为 {member_info.status.value}，仅发展对象可指定入党介绍人")
             return False
+        introducers = normalize_names(introducers)
         if len(introducers) != INTRODUCERS_REQUIRED:
             st.error(f"❌ 入党介绍人需{INTRODUCERS_REQUIRED}名正式党员，当前数量：{len(introducers)}")
             return False
@@ -251,15 +473,17 @@ class PartyOrganization:
         member_info.extra_info["introducers"] = introducers
         member_info.add_process_record(
             "指定入党介绍人",
-            f"入党介绍人：{','.join(introducers)}，操作人：{operator}"
+            f"入党介绍人：{','.join(introducers)}，操作人：{operator}",
+            operator
         )
-        self.save_data()
+        self._commit(member_info)
         st.success(f"✅ 已为学号 {student_id} 指定入党介绍人：{','.join(introducers)}")
         return True
 
     # ------------------------------
     # 预备党员阶段操作
     # ------------------------------
+    @_locked
     def confirm_probationary_member(self, student_id: str, vote_result: str, operator: str) -> bool:
         """接收为预备党员"""
         member_info = self._get_member_info(student_id)
@@ -289,10 +513,11 @@ class PartyOrganization:
             operator,
             remark=f"支部大会表决通过，接收为预备党员，表决结果：{vote_result}"
         )
-        self.save_data()
+        self._commit(member_info)
         st.success(f"✅ 学号 {student_id} 已接收为预备党员")
         return True
 
+    @_locked
     def hold_oath_ceremony(self, student_id: str, oath_date: str, operator: str) -> bool:
         """记录入党宣誓"""
         member_info = self._get_member_info(student_id)
@@ -302,6 +527,11 @@ class PartyOrganization:
         if member_info.status != PartyMemberStatus.PROBATIONARY_MEMBER:
             st.error(f"❌ 当前状态为 {member_info.status.value}，仅预备党员需进行入党宣誓")
             return False
+        try:
+            oath_ts = to_ts(datetime.strptime(oath_date, DATE_FORMAT))
+        except ValueError:
+            st.error(f"❌ 日期格式错误，请输入 YYYY-MM-DD 格式")
+            return False
 
         # 记录宣誓信息
         member_info.add_material(
@@ -309,14 +539,15 @@ class PartyOrganization:
             f"入党宣誓时间：{oath_date}，组织单位：{self.org_name}",
             operator
         )
-        member_info.extra_info["oath_time"] = oath_date
-        self.save_data()
+        member_info.extra_info["oath_time"] = oath_ts
+        self._commit(member_info)
         st.success(f"✅ 学号 {student_id} 已完成入党宣誓，时间：{oath_date}")
         return True
 
     # ------------------------------
     # 正式党员阶段操作
     # ------------------------------
+    @_locked
     def confirm_formal_member(self, student_id: str, conversion_date: str, operator: str) -> bool:
         """按期转为正式党员"""
         member_info = self._get_member_info(student_id)
@@ -336,8 +567,8 @@ class PartyOrganization:
 
         # 校验预备期
         try:
-            oath_dt = datetime.strptime(oath_time, "%Y-%m-%d")
-            conversion_dt = datetime.strptime(conversion_date, "%Y-%m-%d")
+            oath_dt = datetime.fromtimestamp(oath_time)
+            conversion_dt = datetime.strptime(conversion_date, DATE_FORMAT)
             if (conversion_dt - oath_dt).days < PROBATION_PERIOD_DAYS:
                 st.error(f"❌ 预备期未满{PROBATION_PERIOD_DAYS}天（当前：{(conversion_dt - oath_dt).days}天），无法转正")
                 return False
@@ -346,14 +577,14 @@ class PartyOrganization:
             return False
 
         # 更新状态
-        member_info.extra_info["conversion_time"] = conversion_date
-        member_info.extra_info["party_age_start"] = conversion_date
+        member_info.extra_info["conversion_time"] = to_ts(conversion_dt)
+        member_info.extra_info["party_age_start"] = to_ts(conversion_dt)
         member_info.update_status(
             PartyMemberStatus.FORMAL_MEMBER,
             operator,
             remark=f"预备期已满，按期转为正式党员，党龄起算日：{conversion_date}"
         )
-        self.save_data()
+        self._commit(member_info)
         st.success(f"✅ 学号 {student_id} 已按期转为正式党员，党龄起算日：{conversion_date}")
         return True
 
@@ -366,24 +597,26 @@ class PartyOrganization:
         if not member_info:
             return None
 
+        # 展示内容按该学生的版本号缓存，仅在其信息变更后重新计算
+        view = self.render_cache.get_or_build(
+            ("member", student_id), self.member_versions.get(student_id, 0),
+            lambda: self._build_member_view(member_info)
+        )
+
         # 卡片式展示基础信息
         st.subheader(f"📋 学生党建信息详情")
         col1, col2 = st.columns(2)
         with col1:
-            st.write(f"**学号**：{member_info.student.student_id}")
-            st.write(f"**姓名**：{member_info.student.name}")
-            st.write(f"**院系**：{member_info.student.college}")
-            st.write(f"**专业**：{member_info.student.major}")
+            for line in view["left"]:
+                st.write(line)
         with col2:
-            st.write(f"**年级**：{member_info.student.grade}")
-            st.write(f"**联系方式**：{member_info.student.phone}")
-            st.write(f"**当前状态**：{member_info.status.value}")
-            st.write(f"**录入时间**：{member_info.create_time}")
+            for line in view["right"]:
+                st.write(line)
 
         # 展开面板展示详细信息
-        self._display_materials(member_info.materials)
-        self._display_extra_info(member_info.extra_info)
-        self._display_process_records(member_info.process_records)
+        self._display_materials(view["materials"])
+        self._display_extra_info(view["extra_info"])
+        self._display_process_records(view["records"])
 
         return member_info
 
@@ -391,6 +624,20 @@ class PartyOrganization:
         """统计各阶段人数（图表展示）"""
         st.subheader(f"📊 {self.org_name} 学生党建统计")
 
+        # 图表与表格只取决于各阶段人数，按阶段分布版本号缓存（流程记录等变更不会使其失效）
+        chart, table, total = self.render_cache.get_or_build(
+            "statistics", self.status_version, self._build_statistics
+        )
+        st.altair_chart(chart, use_container_width=True)
+        st.table(table)
+        st.write(f"**总计**：{total} 人")
+
+    @_locked
+    def _build_statistics(self) -> Tuple:
+        """计算统计页的 Altair 图表、统计表格与总人数"""
+        # pandas/Altair 仅统计页使用，延迟到此处导入以加快冷启动
+        import pandas as pd
+        import altair as alt
 
         # 统计各阶段人数
         status_count = {status: 0 for status in PartyMemberStatus}
@@ -417,20 +664,188 @@ class PartyOrganization:
             width=600,
             height=400
         )
-        st.altair_chart(chart, use_container_width=True)
 
         # 统计表格
         total = len(self.member_infos)
-        st.table({
+        table = {
             "党员发展阶段": status_names,
             "人数": counts,
             "占比": [f"{count / total * 100:.1f}%" if total else "0%" for count in counts]
-        })
-        st.write(f"**总计**：{total} 人")
+        }
+        return chart, table, total
+
+    @_locked
+    def complete_students(self, prefix: str,
+                          statuses: Optional[List[PartyMemberStatus]] = None) -> List[Tuple[str, str]]:
+        """学号/姓名自动补全：返回 [(学号, 展示文本)]，statuses 限定学生所处阶段"""
+        return [
+            (sid, f"{sid} {self.member_infos[sid].student.name}")
+            for sid in self.student_index.complete(prefix, statuses)
+            if sid in self.member_infos
+        ]
+
+    # ------------------------------
+    # 人员工作量查询（基于反向索引）
+    # ------------------------------
+    @_locked
+    def person_students(self, name: str, role: str, active_only: bool = True,
+                        since: Optional[TimeValue] = None) -> List[str]:
+        """查询某人以某角色关联的学生学号
+
+        active_only：仅统计学生仍处于该角色在岗阶段的（如培养联系人只计积极分子）
+        since：仅统计指定时间不早于该时间的（时间戳或 YYYY-MM-DD）
+        """
+        assigned = self.person_index.by_person.get(name, {}).get(role, {})
+        return sorted(
+            sid for sid, assign_time in assigned.items()
+            if self._counts_toward(sid, assign_time, role, active_only, since)
+        )
+
+    @_locked
+    def person_workload(self, name: str, active_only: bool = True) -> Dict[str, int]:
+        """某人各角色的工作量：角色 -> 学生人数"""
+        return {
+            role: len(self.person_students(name, role, active_only))
+            for role in self.person_index.students_of(name)
+        }
+
+    @_locked
+    def persons_exceeding(self, role: str, threshold: int, active_only: bool = False,
+                          since: Optional[TimeValue] = None) -> Dict[str, int]:
+        """查询某角色下关联学生数超过阈值的人员：人员 -> 人数（降序）"""
+        result = {}
+        for name, assigned in self.person_index.assignments(role).items():
+            count = sum(
+                1 for sid, assign_time in assigned.items()
+                if self._counts_toward(sid, assign_time, role, active_only, since)
+            )
+            if count > threshold:
+                result[name] = count
+        return dict(sorted(result.items(), key=lambda item: (-item[1], item[0])))
+
+    @_locked
+    def suggest_assignees(self, role: str, candidates: Optional[List[str]] = None,
+                          limit: int = 5) -> List[Tuple[str, int]]:
+        """负载均衡建议：按当前在岗工作量升序返回 [(人员, 人数)]
+
+        candidates 为空时，从索引中担任过该角色的人员中挑选
+        """
+        names = normalize_names(candidates) if candidates else self.person_index.persons(role)
+        loads = [(name, len(self.person_students(name, role))) for name in names]
+        loads.sort(key=lambda item: (item[1], item[0]))
+        return loads[:limit]
+
+    # ------------------------------
+    # 时间范围审计查询（基于有序时间索引）
+    # ------------------------------
+    @_locked
+    def records_between(self, start: Optional[TimeValue] = None, end: Optional[TimeValue] = None,
+                        operator: Optional[str] = None,
+                        transitions_only: bool = False) -> List[Tuple[str, Dict]]:
+        """查询时间范围 [start, end) 内的流程记录，返回 [(学号, 记录)]（按时间升序）
+
+        operator：仅返回该操作人的记录；transitions_only：仅返回状态变更记录
+        """
+        result = []
+        for _, sid, key in self._range(self.record_index, start, end):
+            record = self.member_infos[sid].process_records[int(key)]
+            if operator and record_operator(record) != operator:
+                continue
+            if transitions_only and not record["title"].startswith("状态变更"):
+                continue
+            result.append((sid, record))
+        return result
+
+    @_locked
+    def materials_between(self, start: Optional[TimeValue] = None, end: Optional[TimeValue] = None,
+                          material_type: Optional[MaterialType] = None
+                          ) -> List[Tuple[str, MaterialType, Dict]]:
+        """查询时间范围 [start, end) 内提交的材料，返回 [(学号, 材料类型, 材料详情)]"""
+        result = []
+        for _, sid, key in self._range(self.material_index, start, end):
+            mt = MaterialType[key]
+            if material_type is None or mt == material_type:
+                result.append((sid, mt, self.member_infos[sid].materials[mt]))
+        return result
 
     # ------------------------------
     # 内部辅助方法（私有）
     # ------------------------------
+    def _replace_all(self, data: Dict) -> None:
+        """以一份完整数据替换内存中的全部党建信息并重建索引"""
+        self.member_infos = {
+            sid: PartyMemberInfo.from_dict(member_data)
+            for sid, member_data in data.items()
+        }
+        self.person_index.rebuild(self.member_infos)
+        self.student_index.rebuild(self.member_infos)
+        self.record_index.clear()
+        self.material_index.clear()
+        for member_info in self.member_infos.values():
+            self._index_times(member_info)
+        self.data_version += 1
+        self.member_versions = {sid: self.data_version for sid in self.member_infos}
+        self._statuses = {sid: member_info.status for sid, member_info in self.member_infos.items()}
+        self.status_version += 1
+
+    def _commit(self, member_info: PartyMemberInfo) -> None:
+        """某学生信息变更后：同步各索引、保存并更新该学生的版本号"""
+        self._index_member(member_info)
+        self.save_data()
+        self.member_versions[member_info.student.student_id] = self.data_version
+
+    def _index_member(self, member_info: PartyMemberInfo) -> None:
+        """登记某学生到反向索引、前缀索引与时间索引"""
+        self._set_status(member_info.student.student_id, member_info.status)
+        self.person_index.index_member(member_info)
+        self.student_index.index_member(member_info)
+        self._index_times(member_info)
+
+    def _unindex_member(self, student_id: str) -> None:
+        """从全部索引与渲染缓存中移除某学生"""
+        self.member_versions.pop(student_id, None)
+        self.render_cache.discard(("member", student_id))
+        self.person_index.remove_member(student_id)
+        self.student_index.remove_member(student_id)
+        self.record_index.remove_member(student_id)
+        self.material_index.remove_member(student_id)
+
+    def _set_status(self, student_id: str, status: Optional[PartyMemberStatus]) -> None:
+        """登记某学生的发展阶段（None 表示已删除）；阶段有变化时递增阶段分布版本号"""
+        if self._statuses.get(student_id) == status:
+            return
+        if status is None:
+            self._statuses.pop(student_id, None)
+        else:
+            self._statuses[student_id] = status
+        self.status_version += 1
+
+    def _index_times(self, member_info: PartyMemberInfo) -> None:
+        """同步某学生的流程记录与材料时间（已登记且时间未变的跳过）"""
+        sid = member_info.student.student_id
+        for pos in range(len(self.record_index.keys_of(sid)), len(member_info.process_records)):
+            self.record_index.add(member_info.process_records[pos]["time"], sid, str(pos))
+        for mt, detail in member_info.materials.items():
+            self.material_index.add(detail["submit_time"], sid, mt.name)
+
+    def _range(self, index: TimeIndex, start: Optional[TimeValue],
+               end: Optional[TimeValue]) -> List[Tuple[int, str, str]]:
+        """时间索引范围查询（边界支持时间戳或日期字符串）"""
+        return index.between(
+            None if start is None else to_ts(start),
+            None if end is None else to_ts(end)
+        )
+
+    def _counts_toward(self, student_id: str, assign_time: int, role: str,
+                       active_only: bool, since: Optional[TimeValue]) -> bool:
+        """判断某条指定记录是否计入工作量"""
+        member_info = self.member_infos.get(student_id)
+        if not member_info:
+            return False
+        if active_only and member_info.status not in ROLE_ACTIVE_STATUSES[role]:
+            return False
+        return since is None or assign_time >= to_ts(since)
+
     def _get_member_info(self, student_id: str) -> Optional[PartyMemberInfo]:
         """获取学生党建信息（内部复用）"""
         member_info = self.member_infos.get(student_id)
@@ -439,43 +854,82 @@ class PartyOrganization:
             return None
         return member_info
 
-    def _display_materials(self, materials: Dict[MaterialType, Dict]) -> None:
+    @_locked
+    def _build_member_view(self, member_info: PartyMemberInfo) -> Dict:
+        """计算详情页展示内容（纯文本，可缓存）"""
+        student = member_info.student
+        return {
+            "left": [
+                f"**学号**：{student.student_id}",
+                f"**姓名**：{student.name}",
+                f"**院系**：{student.college}",
+                f"**专业**：{student.major}",
+            ],
+            "right": [
+                f"**年级**：{student.grade}",
+                f"**联系方式**：{student.phone}",
+                f"**当前状态**：{member_info.status.value}",
+                f"**录入时间**：{format_ts(member_info.create_time)}",
+            ],
+            "materials": [
+                [
+                    f"• {mt.value}",
+                    f"  提交时间：{format_ts(detail['submit_time'])}",
+                    f"  审核人：{detail['reviewer']}",
+                    f"  内容：{detail['content'][:50]}..." if len(
+                        detail['content']) > 50 else f"  内容：{detail['content']}",
+                ]
+                for mt, detail in member_info.materials.items()
+            ],
+            "extra_info": self._extra_info_lines(member_info.extra_info),
+            # 倒序显示最近N条
+            "records": [
+                [f"{idx}. {format_ts(record['time'])} | {record['title']}", f"   {record['detail']}"]
+                for idx, record in enumerate(member_info.process_records[-MAX_RECORD_DISPLAY:][::-1], 1)
+            ],
+        }
+
+    def _extra_info_lines(self, extra_info: Dict) -> List[str]:
+        """额外信息的展示文本"""
+        lines = []
+        for key, val in extra_info.items():
+            if key == "active_member_reviews":
+                lines.append(f"• 积极分子考察记录：共{len(val)}次")
+                for idx, review in enumerate(val, 1):
+                    lines.append(f"  第{idx}次：{format_ts(review['review_time'], DATE_FORMAT)}（考察人：{review['reviewer']}）")
+            elif key in EXTRA_DATE_FIELDS:
+                lines.append(f"• {key}：{format_ts(val, DATE_FORMAT)}")
+            else:
+                lines.append(f"• {key}：{val}")
+        return lines
+
+    def _display_materials(self, materials: List[List[str]]) -> None:
         """展示已提交材料"""
         with st.expander("📄 已提交材料", expanded=False):
             if materials:
-                for mt, detail in materials.items():
-                    st.write(f"• {mt.value}")
-                    st.write(f"  提交时间：{detail['submit_time']}")
-                    st.write(f"  审核人：{detail['reviewer']}")
-                    st.write(f"  内容：{detail['content'][:50]}..." if len(
-                        detail['content']) > 50 else f"  内容：{detail['content']}")
+                for lines in materials:
+                    for line in lines:
+                        st.write(line)
                     st.divider()
             else:
                 st.info("暂无提交材料")
 
-    def _display_extra_info(self, extra_info: Dict) -> None:
+    def _display_extra_info(self, lines: List[str]) -> None:
         """展示额外信息"""
         with st.expander("🔍 关键信息", expanded=False):
-            if extra_info:
-                for key, val in extra_info.items():
-                    if key == "active_member_reviews":
-                        st.write(f"• 积极分子考察记录：共{len(val)}次")
-                        for idx, review in enumerate(val, 1):
-                            st.write(f"  第{idx}次：{review['review_time']}（考察人：{review['reviewer']}）")
-                    else:
-                        st.write(f"• {key}：{val}")
+            if lines:
+                for line in lines:
+                    st.write(line)
             else:
                 st.info("暂无关键信息")
 
-    def _display_process_records(self, records: List[Dict]) -> None:
+    def _display_process_records(self, records: List[List[str]]) -> None:
         """展示流程记录"""
         with st.expander(f"📝 流程记录（最近{MAX_RECORD_DISPLAY}条）", expanded=False):
             if records:
-                # 倒序显示最近N条
-                recent_records = records[-MAX_RECORD_DISPLAY:][::-1]
-                for idx, record in enumerate(recent_records, 1):
-                    st.write(f"{idx}. {record['time']} | {record['title']}")
-                    st.write(f"   {record['detail']}")
+                for lines in records:
+                    for line in lines:
+                        st.write(line)
                     st.divider()
             else:
                 st.info("暂无流程记录")
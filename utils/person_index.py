@@ -0,0 +1,126 @@
+"""人员反向索引：推荐人、培养联系人、入党介绍人 -> 学生"""
+import re
+from typing import Dict, Iterable, List, Optional, Set
+
+from .models import PartyMemberInfo
+from .enums import PartyMemberStatus
+
+# 角色键（与 extra_info 中的字段名一致）
+ROLE_RECOMMENDER = "recommenders"
+ROLE_TRAINER = "trainers"
+ROLE_INTRODUCER = "introducers"
+ROLES = (ROLE_RECOMMENDER, ROLE_TRAINER, ROLE_INTRODUCER)
+
+ROLE_NAMES = {
+    ROLE_RECOMMENDER: "推荐人",
+    ROLE_TRAINER: "培养联系人",
+    ROLE_INTRODUCER: "入党介绍人",
+}
+
+# 各角色“在岗”时学生所处阶段（用于统计当前工作量）
+ROLE_ACTIVE_STATUSES = {
+    ROLE_RECOMMENDER: {PartyMemberStatus.ACTIVE_MEMBER},
+    ROLE_TRAINER: {PartyMemberStatus.ACTIVE_MEMBER},
+    ROLE_INTRODUCER: {PartyMemberStatus.DEVELOPMENT_OBJECT, PartyMemberStatus.PROBATIONARY_MEMBER},
+}
+
+# 指定各角色时写入的流程记录标题（用于推断指定时间）
+_ROLE_RECORD_TITLES = {
+    ROLE_RECOMMENDER: f"→ {PartyMemberStatus.ACTIVE_MEMBER.value}",
+    ROLE_TRAINER: "指定培养联系人",
+    ROLE_INTRODUCER: "指定入党介绍人",
+}
+
+_NAME_SEPARATORS = re.compile(r"[,，、;；]")
+
+
+def normalize_names(names: Iterable[str]) -> List[str]:
+    """规范化人员名单：拆分中英文分隔符、去除空白与空项、按首次出现去重"""
+    result: List[str] = []
+    for raw in names or []:
+        for name in _NAME_SEPARATORS.split(str(raw)):
+            name = name.strip()
+            if name and name not in result:
+                result.append(name)
+    return result
+
+
+def _assign_time(member_info: PartyMemberInfo, role: str) -> int:
+    """从流程记录中推断该角色的最近指定时间（找不到时退回录入时间）"""
+    title = _ROLE_RECORD_TITLES[role]
+    for record in reversed(member_info.process_records):
+        if record["title"].endswith(title):
+            return record["time"]
+    return member_info.create_time
+
+
+class PersonIndex:
+    """人员反向索引：人员 -> 角色 -> {学号: 指定时间}"""
+
+    def __init__(self):
+        self.by_person: Dict[str, Dict[str, Dict[str, int]]] = {}
+        self.by_student: Dict[str, Dict[str, List[str]]] = {}  # 学号 -> 角色 -> 人员（用于撤销）
+
+    def rebuild(self, member_infos: Dict[str, PartyMemberInfo]) -> None:
+        """根据全部党建信息重建索引（加载数据后调用）"""
+        self.by_person = {}
+        self.by_student = {}
+        for member_info in member_infos.values():
+            self.index_member(member_info)
+
+    def index_member(self, member_info: PartyMemberInfo) -> None:
+        """（重新）登记某个学生的全部角色人员"""
+        student_id = member_info.student.student_id
+        self.remove_member(student_id)
+        for role in ROLES:
+            names = member_info.extra_info.get(role)
+            if names:
+                self.set_role(student_id, role, names, _assign_time(member_info, role))
+
+    def set_role(self, student_id: str, role: str, names: Iterable[str], assign_time: int) -> None:
+        """设置某学生某角色的人员名单（覆盖旧名单）"""
+        self._unlink(student_id, role)
+        names = normalize_names(names)
+        if not names:
+            return
+        self.by_student.setdefault(student_id, {})[role] = names
+        for name in names:
+            self.by_person.setdefault(name, {}).setdefault(role, {})[student_id] = assign_time
+
+    def remove_member(self, student_id: str) -> None:
+        """从索引中移除某个学生"""
+        for role in list(self.by_student.get(student_id, {})):
+            self._unlink(student_id, role)
+        self.by_student.pop(student_id, None)
+
+    def students_of(self, name: str, role: Optional[str] = None) -> Dict[str, Set[str]]:
+        """查询某人关联的学生：角色 -> 学号集合"""
+        roles = self.by_person.get(name, {})
+        return {
+            r: set(sids) for r, sids in roles.items()
+            if role is None or r == role
+        }
+
+    def assignments(self, role: str) -> Dict[str, Dict[str, int]]:
+        """某角色下全部人员的指定记录：人员 -> {学号: 指定时间}"""
+        return {
+            name: roles[role] for name, roles in self.by_person.items() if role in roles
+        }
+
+    def persons(self, role: Optional[str] = None) -> List[str]:
+        """索引中出现过的人员（可按角色过滤）"""
+        return sorted(
+            name for name, roles in self.by_person.items()
+            if role is None or role in roles
+        )
+
+    def _unlink(self, student_id: str, role: str) -> None:
+        """撤销某学生某角色的旧登记"""
+        old_names = self.by_student.get(student_id, {}).pop(role, [])
+        for name in old_names:
+            roles = self.by_person.get(name, {})
+            roles.get(role, {}).pop(student_id, None)
+            if role in roles and not roles[role]:
+                del roles[role]
+            if name in self.by_person and not roles:
+                del self.by_person[name]
@@ -0,0 +1,91 @@
+"""学号/姓名前缀索引：为各操作表单提供按阶段过滤的实时候选"""
+from bisect import bisect_left, insort
+from heapq import merge
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .models import PartyMemberInfo
+from .enums import PartyMemberStatus
+from .constants import AUTOCOMPLETE_LIMIT
+
+
+class StudentPrefixIndex:
+    """按阶段分组的有序键表 [(学号或姓名, 学号)]
+
+    有序表上二分定位前缀区间，等价于一棵压平的前缀树，但内存占用小得多；
+    None 分组收录全部学生，供查询、删除等不限阶段的表单使用
+    """
+
+    def __init__(self):
+        self.groups: Dict[Optional[PartyMemberStatus], List[Tuple[str, str]]] = {None: []}
+        self.entries: Dict[str, Tuple[PartyMemberStatus, List[Tuple[str, str]]]] = {}  # 学号 -> (阶段, 键)
+
+    def rebuild(self, member_infos: Dict[str, PartyMemberInfo]) -> None:
+        """根据全部党建信息重建索引"""
+        self.groups = {None: []}
+        self.entries = {}
+        for member_info in member_infos.values():
+            status, keys = member_info.status, self._keys(member_info)
+            self.entries[member_info.student.student_id] = (status, keys)
+            self.groups[None].extend(keys)
+            self.groups.setdefault(status, []).extend(keys)
+        for keys in self.groups.values():
+            keys.sort()
+
+    def index_member(self, member_info: PartyMemberInfo) -> None:
+        """（重新）登记某学生；阶段与姓名未变时不做任何操作"""
+        student_id = member_info.student.student_id
+        status, keys = member_info.status, self._keys(member_info)
+        if self.entries.get(student_id) == (status, keys):
+            return
+        self.remove_member(student_id)
+        self.entries[student_id] = (status, keys)
+        for group in (None, status):
+            for key in keys:
+                insort(self.groups.setdefault(group, []), key)
+
+    def remove_member(self, student_id: str) -> None:
+        """从索引中移除某学生"""
+        entry = self.entries.pop(student_id, None)
+        if entry is None:
+            return
+        status, keys = entry
+        for group in (None, status):
+            group_keys = self.groups.get(group, [])
+            for key in keys:
+                pos = bisect_left(group_keys, key)
+                if pos < len(group_keys) and group_keys[pos] == key:
+                    del group_keys[pos]
+
+    def complete(self, prefix: str, statuses: Optional[Iterable[PartyMemberStatus]] = None,
+                 limit: int = AUTOCOMPLETE_LIMIT) -> List[str]:
+        """返回学号或姓名以 prefix 开头的学号（按学号排序），最多 limit 个
+
+        多个阶段时先按键顺序合并各分组的匹配项再截取，与在全体分组中查找的结果一致
+        """
+        prefix = prefix.strip()
+        groups = [None] if statuses is None else statuses
+        result: List[str] = []
+        seen = set()
+        for _, student_id in merge(*(self._matches(self.groups.get(group, []), prefix) for group in groups)):
+            if len(result) >= limit:
+                break
+            if student_id not in seen:
+                seen.add(student_id)
+                result.append(student_id)
+        return sorted(result)
+
+    @staticmethod
+    def _matches(keys: List[Tuple[str, str]], prefix: str) -> Iterator[Tuple[str, str]]:
+        """按键顺序逐个产出以 prefix 开头的键（惰性，只扫描实际用到的部分）"""
+        pos = bisect_left(keys, (prefix,))
+        while pos < len(keys) and keys[pos][0].startswith(prefix):
+            yield keys[pos]
+            pos += 1
+
+    @staticmethod
+    def _keys(member_info: PartyMemberInfo) -> List[Tuple[str, str]]:
+        student = member_info.student
+        keys = [(student.student_id, student.student_id)]
+        if student.name and student.name != student.student_id:
+            keys.append((student.name, student.student_id))
+        return keys
@@ -0,0 +1,43 @@
+"""渲染缓存：缓存页面所需的计算结果（数据表、图表定义、详情文本），按数据版本号失效"""
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+from .constants import RENDER_CACHE_SIZE
+
+
+class RenderCache:
+    """按键缓存渲染结果，每个键只保留最新版本；超出容量时淘汰最久未使用的键"""
+
+    def __init__(self, maxsize: int = RENDER_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()  # 键 -> (版本号, 结果)
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key: Hashable, version: int, builder: Callable[[], Any]) -> Any:
+        """版本号一致时直接返回缓存结果，否则调用 builder 重新计算并替换旧结果"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+        value = builder()
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = (version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def discard(self, key: Hashable) -> None:
+        """移除某个键的缓存（如学生被删除）"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,60 @@
+"""全局时间索引：按时间戳有序保存事件，日期范围查询用二分查找"""
+import re
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional, Tuple
+
+_OPERATOR_PATTERN = re.compile(r"(?:操作人|考察人)：([^，,]+)")
+
+
+def record_operator(record: Dict) -> str:
+    """获取流程记录的操作人（旧记录没有 operator 字段，从详情文本中解析）"""
+    if record.get("operator"):
+        return record["operator"]
+    match = _OPERATOR_PATTERN.search(record.get("detail", ""))
+    return match.group(1).strip() if match else ""
+
+
+class TimeIndex:
+    """有序事件索引：[(时间戳, 学号, 事件键)]，事件键在同一学生内唯一"""
+
+    def __init__(self):
+        self.entries: List[Tuple[int, str, str]] = []
+        self.by_student: Dict[str, Dict[str, int]] = {}  # 学号 -> 事件键 -> 时间戳（用于撤销）
+
+    def clear(self) -> None:
+        self.entries = []
+        self.by_student = {}
+
+    def add(self, ts: int, student_id: str, key: str) -> None:
+        """登记事件；同一事件键时间未变时不做任何操作"""
+        keys = self.by_student.setdefault(student_id, {})
+        if keys.get(key) == ts:
+            return
+        self.discard(student_id, key)
+        keys[key] = ts
+        insort(self.entries, (ts, student_id, key))
+
+    def discard(self, student_id: str, key: str) -> None:
+        """撤销某学生的某个事件"""
+        ts = self.by_student.get(student_id, {}).pop(key, None)
+        if ts is None:
+            return
+        pos = bisect_left(self.entries, (ts, student_id, key))
+        if pos < len(self.entries) and self.entries[pos] == (ts, student_id, key):
+            del self.entries[pos]
+
+    def remove_member(self, student_id: str) -> None:
+        """撤销某学生的全部事件"""
+        for key in list(self.by_student.get(student_id, {})):
+            self.discard(student_id, key)
+        self.by_student.pop(student_id, None)
+
+    def keys_of(self, student_id: str) -> List[str]:
+        """某学生已登记的事件键"""
+        return list(self.by_student.get(student_id, {}))
+
+    def between(self, start: Optional[int] = None, end: Optional[int] = None) -> List[Tuple[int, str, str]]:
+        """时间范围查询 [start, end)，按时间升序返回"""
+        lo = 0 if start is None else bisect_left(self.entries, (start,))
+        hi = len(self.entries) if end is None else bisect_left(self.entries, (end,))
+        return self.entries[lo:hi]
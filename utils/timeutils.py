@@ -0,0 +1,33 @@
+"""时间工具：内部统一以整数时间戳（秒）存储，仅在输入输出边界做格式转换"""
+from datetime import datetime
+from typing import Optional, Union
+
+from .constants import DATETIME_FORMAT, DATE_FORMAT
+
+TimeValue = Union[int, float, str, datetime]
+
+
+def now_ts() -> int:
+    """当前时间戳（秒）"""
+    return int(datetime.now().timestamp())
+
+
+def to_ts(value: TimeValue) -> int:
+    """任意时间表示 -> 时间戳（兼容旧数据中的 "YYYY-MM-DD HH:MM:SS" / "YYYY-MM-DD" 字符串）"""
+    if isinstance(value, datetime):
+        return int(value.timestamp())
+    if isinstance(value, (int, float)):
+        return int(value)
+    for fmt in (DATETIME_FORMAT, DATE_FORMAT):
+        try:
+            return int(datetime.strptime(value, fmt).timestamp())
+        except ValueError:
+            continue
+    raise ValueError(f"无法识别的时间格式：{value}")
+
+
+def format_ts(ts: Optional[TimeValue], fmt: str = DATETIME_FORMAT) -> str:
+    """时间戳 -> 展示用字符串（空值返回空串）"""
+    if ts is None or ts == "":
+        return ""
+    return datetime.fromtimestamp(to_ts(ts)).strftime(fmt)